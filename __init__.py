@@ -8,18 +8,43 @@ import asyncio
 import websockets
 import json
 import datetime
+import hashlib
+import random
 import ssl
-import re
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import update_coordinator
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.util.ssl import get_default_context
 from homeassistant.components import persistent_notification
 
-from .const import DOMAIN
-from .helper import request_ajax, get_html, Credentials
+from .const import (
+    CONF_PING_INTERVAL,
+    CONF_RECORD_FRAMES,
+    CONF_SILENCE_TIMEOUT,
+    DEFAULT_PING_INTERVAL,
+    DEFAULT_SILENCE_TIMEOUT,
+    DOMAIN,
+    REFRESH_INTERVAL,
+    REFRESH_JITTER,
+    WEBSOCKET_URL,
+)
+from .control import ControlQueue, OptimisticStates
+from .decoder import decode_frame, frame_from_message
+from .frames import FRAMES_FILE, FrameRecorder
+from .helper import (
+    request_ajax,
+    get_html,
+    http_stats,
+    close_http_session,
+    Credentials,
+)
+from .metrics import LatencyStats, WebsocketStats
+from .states import DeviceState, InvalidState, parse_state
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,14 +55,48 @@ PLATFORMS: list[Platform] = [
     Platform.SWITCH,
     Platform.BUTTON,
     Platform.FAN,
+    Platform.SENSOR,
 ]
 
 
 MESSAGE_LOGGED_OUT = "장시간 미사용으로 로그아웃 되었습니다."
 MESSAGE_WEBSOCKET_TOKEN_EXPIRED = "만료된 클라우드토큰 입니다."
-MESSAGE_WEBSOCKET_STATUS_NORMAL = "정상"
 
 MAX_CONNECTION_AGE = timedelta(hours=1)
+# How often the push task checks its connection's liveness.
+WATCHDOG_INTERVAL = timedelta(seconds=5)
+
+# Session state changes in bursts (csrf, token, keys), so saving it back
+# to the config entry waits for things to settle.
+CREDENTIALS_SAVE_DELAY = timedelta(seconds=30)
+
+# The parsed home.do (device list, websocket keys) is cached on disk, so a
+# restart can set platforms up without waiting for the cloud.
+HOME_SNAPSHOT_VERSION = 1
+
+# How soon to try again when a background session refresh failed.
+SESSION_RETRY_DELAY = timedelta(minutes=1)
+
+# Bulk device status fetches: how many run at once, and how long each may
+# take in total (a fast-fail attempt plus the patient retry).
+STATUS_CONCURRENCY = 4
+STATUS_TIMEOUT = timedelta(seconds=20)
+# ...and how many may start per second, so a resync of a big home doesn't
+# hammer the cloud.
+STATUS_RATE = 10
+
+# The device types the websocket pushes, and a resync fetches.
+PUSH_TYPES = [
+    "light",
+    "heat",
+    "alloffswitch",
+    "smartdoor",
+    "aircon",
+    "wallsocket",
+    "vent",
+    "gas",
+    # "call",
+]
 
 
 def is_logged_out(response) -> bool:
@@ -50,6 +109,30 @@ def is_logged_out(response) -> bool:
     return result.get("message") == MESSAGE_LOGGED_OUT
 
 
+def device_layout_hash(device_list) -> str:
+    """Hash what decides which entities exist and how they are named.
+
+    Live state (operations, car locations) is left out, so the hash only
+    moves when devices are added, removed or renamed.
+    """
+    layout = [
+        [devices["type"]]
+        + [
+            [
+                device.get("uid") or device.get("tag_num"),
+                device.get("device_name"),
+                device.get("location_name"),
+                device.get("location_name_alias"),
+                # heating zones without an operation get no entity
+                bool(device.get("operation", True)),
+            ]
+            for device in devices["devices"]
+        ]
+        for devices in device_list
+    ]
+    return hashlib.sha256(json.dumps(layout).encode()).hexdigest()
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up daelim-smarthome from a config entry."""
     credentials = Credentials.from_dict(entry.data["credentials"])
@@ -57,6 +140,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     await coordinator.async_config_entry_first_refresh()
     hass.data[DOMAIN] = coordinator
+    # the shared HTTP session outlives entries, but not Home Assistant
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, close_http_session)
+    )
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -82,70 +169,255 @@ class MyCoordinator(update_coordinator.DataUpdateCoordinator):
         )
         self.entry = entry
         self.credentials = credentials
+        # Persist every refreshed session, so a restart can slide the live
+        # token with refresh() instead of paying a full login(), which
+        # would also invalidate the cloud token.
+        self._credentials_saver = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=CREDENTIALS_SAVE_DELAY.total_seconds(),
+            immediate=False,
+            function=self._async_save_credentials,
+        )
+        credentials.on_change = self._credentials_saver.async_schedule_call
         self.device_list = []
         self.ssl_context = get_default_context()
         self.websocket_keys = None
+        # Last known operation of every device, by uid. Pushes are merged
+        # into it, so it always holds the full picture, unlike `data`,
+        # which only carries what the periodic poll returns (car data).
+        self.device_states: dict[str, dict] = {}
+        # The device_list group (light, heat, ...) of every uid, which
+        # metrics are keyed by.
+        self.device_types: dict[str, str] = {}
+        # device_states parsed by device type (see states.py), which is
+        # what entities read. Only ever written by async_store_state().
+        self.states: dict[str, DeviceState] = {}
+        # Listener callbacks by the context (device uid) they registered
+        # with, so a push is routed in O(changed devices) instead of
+        # walking every entity.
+        self._listeners_by_context: dict = {}
+        # Per push: callbacks run vs. listeners left asleep, and devices
+        # whose pushed operation matched the stored one.
+        self.dispatch_stats = {"delivered": 0, "skipped": 0, "unchanged": 0}
+        # last_update_success as the listeners were last told about it
+        self._notified_success = True
+        self._home_store = Store(
+            hass, HOME_SNAPSHOT_VERSION, f"{DOMAIN}.{entry.entry_id}.home"
+        )
+        # Car data from the snapshot, served by the first poll so a cached
+        # setup doesn't wait on the cloud. None once the live page is in.
+        self._cached_car_data = None
+        self._unsub_session_refresh = None
+        # Seconds from a control request going out to the push confirming
+        # it, by device type.
+        self.command_latency = LatencyStats()
+        self.websocket_stats = WebsocketStats()
+        # the post-reconnect status resync in flight, if any
+        self._resync = None
+        # uids pushed since that resync started, whose fetched status is
+        # already stale; None while no resync runs
+        self._resync_pushed = None
+        self._frame_recorder = None
+        self._optimistic = OptimisticStates(
+            hass,
+            self.device_states,
+            self.async_store_state,
+            self.async_update_devices,
+            self.command_latency,
+        )
+        self._controls = ControlQueue(
+            hass, self.request_ajax, self._optimistic.async_sent
+        )
+
+    @callback
+    def _schedule_session_refresh(self, delay=None) -> None:
+        """Slide the session in the background before anyone needs to.
 
-    def request_device_status(self, device_uid, device_type):
-        return self.request_ajax(
+        By default the refresh is due a random bit (up to REFRESH_JITTER)
+        ahead of REFRESH_INTERVAL, and never later than that much before
+        the token expires, so control requests never pay for auth.
+        """
+        if delay is None:
+            now = datetime.datetime.now()
+            jitter = datetime.timedelta(
+                seconds=random.uniform(0, REFRESH_JITTER.total_seconds())
+            )
+            due = (self.credentials.refreshed_at or now) + REFRESH_INTERVAL - jitter
+            if self.credentials.expire_time:
+                due = min(due, self.credentials.expire_time - REFRESH_JITTER)
+            delay = max((due - now).total_seconds(), 0)
+        self._unsub_session_refresh = async_call_later(
+            self.hass, delay, self._async_refresh_session
+        )
+
+    async def _async_refresh_session(self, _now) -> None:
+        self._unsub_session_refresh = None
+        try:
+            await self.credentials.slide()
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.warning("background session refresh failed: %r", err)
+            self._schedule_session_refresh(SESSION_RETRY_DELAY.total_seconds())
+            return
+        self._schedule_session_refresh()
+
+    @callback
+    def _async_save_credentials(self) -> None:
+        self.hass.config_entries.async_update_entry(
+            self.entry,
+            data=self.entry.data | {"credentials": self.credentials.to_dict()},
+        )
+
+    async def request_device_status(self, device_uid, device_type):
+        return await self.request_ajax(
             "/controls/device/status.ajax", {"uid": device_uid, "type": device_type}
         )
 
-    def request_ajax(self, url, json_data):
-        response = request_ajax(url, self.credentials.daelim_header(), json_data)
+    async def request_device_statuses(self, devices, on_status=None):
+        """Fetch the status of many (uid, type) devices concurrently.
+
+        At most STATUS_CONCURRENCY requests are in flight, at most
+        STATUS_RATE start per second, and each is cut off after
+        STATUS_TIMEOUT, so the batch takes about as long as its slowest
+        device rather than the sum. Returns {uid: response}, with None for
+        the devices that failed. on_status(uid, response), if given, is
+        called as each response arrives.
+        """
+        semaphore = asyncio.Semaphore(STATUS_CONCURRENCY)
+        loop = self.hass.loop
+        next_start = loop.time()
+
+        async def fetch(uid, device_type):
+            nonlocal next_start
+            async with semaphore:
+                start = max(loop.time(), next_start)
+                next_start = start + 1 / STATUS_RATE
+                await asyncio.sleep(start - loop.time())
+                try:
+                    async with asyncio.timeout(STATUS_TIMEOUT.total_seconds()):
+                        response = await self.request_device_status(uid, device_type)
+                except Exception as err:  # noqa: BLE001
+                    _LOGGER.warning("failed to get status of %s: %r", uid, err)
+                    response = None
+                if on_status is not None:
+                    on_status(uid, response)
+                return response
+
+        responses = await asyncio.gather(
+            *(fetch(uid, device_type) for uid, device_type in devices)
+        )
+        return {uid: response for (uid, _), response in zip(devices, responses)}
+
+    async def async_control(self, uid, device_type, operation, expected=None):
+        """Send an operation to a device through /device/control.ajax.
+
+        Bursts of operations to the same device are coalesced into one
+        request (see ControlQueue). `expected` are the operation fields
+        the command should lead to; they are shown optimistically until
+        the websocket confirms them (see OptimisticStates).
+        """
+        return await self._async_send_optimistic(
+            uid,
+            device_type,
+            expected,
+            self._controls.async_control(uid, device_type, operation),
+        )
+
+    async def async_control_all(self, body, expected=None):
+        """Send an on/off command through /device/control/all.ajax.
+
+        `expected` works as for async_control().
+        """
+        return await self._async_send_optimistic(
+            body["uid"], body["type"], expected, self._async_control_all(body)
+        )
+
+    async def _async_control_all(self, body):
+        self._optimistic.async_sent(body["uid"])
+        return await self.request_ajax("/device/control/all.ajax", body)
+
+    async def _async_send_optimistic(self, uid, device_type, expected, send):
+        if not expected:
+            return await send
+        self._optimistic.async_apply(
+            uid, self.device_types.get(uid, device_type), expected
+        )
+        try:
+            response = await send
+        except Exception:
+            self._optimistic.async_reject(uid, expected)
+            raise
+        if not response["result"]:
+            self._optimistic.async_reject(uid, expected)
+        return response
+
+    async def request_ajax(self, url, json_data):
+        header = await self.credentials.daelim_header()
+        response = await request_ajax(url, header, json_data)
         if is_logged_out(response):
             _LOGGER.info("server dropped the session, logging in again")
-            self.credentials.force_login()
-            response = request_ajax(url, self.credentials.daelim_header(), json_data)
+            http_stats.endpoint(url).logged_out_recoveries += 1
+            await self.credentials.force_login(header["daelim_elife"])
+            response = await request_ajax(
+                url, await self.credentials.daelim_header(), json_data
+            )
         return response
 
-    def get_html(self, path):
-        bearer_token = self.credentials.bearer_token()
-        return get_html(path, {"Authorization": f"Bearer {bearer_token}"}).text
-
-    def find_device_list_from_html(self, html):
-        regex = r"const _deviceListByType = '([^']+)'"
-        match = re.search(regex, html)
-        if match:
-            return json.loads(match.group(1))
-        _LOGGER.warning("failed to find device list\n\n{}", html)
-        raise Exception("Cannot find device list!")
-
-    def find_elevator_uid(self, html):
-        # data: JSON.stringify({
-        # "header": {
-        #     "category": "elevator",
-        #     "type": "call",
-        #     "command": "control_request"
-        # },
-        # "data" : {
-        #     "uid": "CMF990100",
-        #     "operation": {
-        #         "control": "down"
-        #     }
-        # },
-        regex = r'"category": "elevator",\s+"type": "call",\s+"command": "control_request"\s+},\s+"data" : {\s+"uid": "([^"]+)"'
-        match = re.search(regex, html)
-        if match:
-            return match.group(1)
-        _LOGGER.warning("failed to find elevator uid\n\n{}", html)
-        return None
+    async def get_html(self, path):
+        bearer_token = await self.credentials.bearer_token()
+        return await get_html(path, {"Authorization": f"Bearer {bearer_token}"})
 
     async def _async_update_data(self):
-        car_data = await self.hass.async_add_executor_job(self.get_car_data)
+        if self.data is None and self._cached_car_data is not None:
+            # first refresh after a cached setup; the live car data comes
+            # with the background home.do refresh
+            return {"car": self._cached_car_data}
+        car_data = await self.get_car_data()
         if car_data is not None:
             return {"car": car_data}
         return dict()
 
     async def _async_setup(self):
         # works after hass version 2024.8
-        html = await self.hass.async_add_executor_job(
-            self.credentials.main_home_html, True
+        snapshot = await self._home_store.async_load()
+        if snapshot:
+            # Set up from the last parsed home.do right away; the live page
+            # is fetched in the background and diffed against it.
+            self.device_list = snapshot["device_list"]
+            self.websocket_keys = snapshot["websocket_keys"]
+            self._cached_car_data = next(
+                (d["devices"] for d in self.device_list if d["type"] == "car"), []
+            )
+            self.hass.async_create_background_task(
+                self._async_refresh_home(snapshot["layout_hash"]),
+                "daelim-home-refresh",
+            )
+        else:
+            self.device_list = await self.fetch_device_list()
+            await self._async_save_home_snapshot()
+        self.seed_device_states()
+        self._schedule_session_refresh()
+
+        self.hass.async_create_background_task(
+            self._connect_websocket(), "daelim-websocket"
         )
-        self.device_list = self.find_device_list_from_html(html)
-        elevator_uid = self.find_elevator_uid(html)
-        if elevator_uid:
-            self.device_list.append(
+
+    async def fetch_device_list(self):
+        """Load home.do and build the device list from it.
+
+        Also (re)reads the websocket keys from the same page, and adds the
+        elevator and the cars, which home.do doesn't list as devices.
+        """
+        page = await self.credentials.home_page(True)
+        if page.device_list is None:
+            _LOGGER.warning("failed to find device list\n\n%s", page.html)
+            raise Exception("Cannot find device list!")
+        device_list = list(page.device_list)
+        elevator_uid = page.elevator_uid
+        if not elevator_uid:
+            _LOGGER.warning("failed to find elevator uid\n\n%s", page.html)
+        else:
+            device_list.append(
                 {
                     "type": "elevator",
                     "devices": [
@@ -157,27 +429,72 @@ class MyCoordinator(update_coordinator.DataUpdateCoordinator):
                 }
             )
 
-        await self.hass.async_add_executor_job(self.fix_heat_datas)
+        await self.fix_heat_datas(device_list)
 
-        # the html fetched above is cached, no need to force refresh
-        self.websocket_keys = await self.hass.async_add_executor_job(
-            self.credentials.websocket_keys_json
-        )
+        # the page fetched above is cached, no need to force refresh
+        self.websocket_keys = await self.credentials.websocket_keys_json()
 
-        car_data = await self.hass.async_add_executor_job(self.get_car_data)
+        car_data = await self.get_car_data()
         if car_data:
-            self.device_list.append(
+            device_list.append(
                 {
                     "type": "car",
                     "devices": car_data,
                 }
             )
+        return device_list
+
+    async def _async_save_home_snapshot(self):
+        await self._home_store.async_save(
+            {
+                "device_list": self.device_list,
+                "websocket_keys": self.websocket_keys,
+                "layout_hash": device_layout_hash(self.device_list),
+            }
+        )
 
-        self.hass.async_create_background_task(
-            self._connect_websocket(), "daelim-websocket"
+    async def _async_refresh_home(self, cached_layout_hash):
+        """Replace a cached device list with the live one.
+
+        Entities were built from the snapshot, so a changed layout can only
+        be picked up by setting up again; otherwise the fresh operations
+        and car data are merged in like a push.
+        """
+        try:
+            device_list = await self.fetch_device_list()
+        except Exception:
+            _LOGGER.exception("failed to refresh the device list from home.do")
+            return
+
+        self.device_list = device_list
+        await self._async_save_home_snapshot()
+        if device_layout_hash(device_list) != cached_layout_hash:
+            self.send_notification(
+                "Daelim devices changed",
+                "The device list on the Daelim server changed since the last "
+                "start. Restart Home Assistant to pick up the changes.",
+                "daelim_devices_changed",
+            )
+
+        updated = set()
+        for devices in device_list:
+            for device in devices["devices"]:
+                uid = device.get("uid")
+                operation = device.get("operation")
+                if uid in self.device_states and operation:
+                    if self.device_states[uid] != operation:
+                        if self.async_store_state(uid, operation):
+                            updated.add(uid)
+        self.async_update_devices(updated)
+
+        self._cached_car_data = None
+        car_data = next(
+            (d["devices"] for d in device_list if d["type"] == "car"), None
         )
+        if car_data is not None:
+            self.async_set_updated_data({"car": car_data})
 
-    def get_car_data(self):
+    async def get_car_data(self):
         url = "/monitoring/locationList.ajax"
         body = {
             "header": {
@@ -192,7 +509,7 @@ class MyCoordinator(update_coordinator.DataUpdateCoordinator):
             },
         }
 
-        resp = self.request_ajax(url, body)
+        resp = await self.request_ajax(url, body)
 
         if resp["result"]["status"] != "000":
             _LOGGER.warning("failed to get car data: %s", resp)
@@ -200,16 +517,96 @@ class MyCoordinator(update_coordinator.DataUpdateCoordinator):
         _LOGGER.debug("got car data: %s", resp)
         return resp["data"]["list"]
 
-    def fix_heat_datas(self):
+    async def fix_heat_datas(self, device_list):
+        """Backfill heating zones that home.do lists without an operation."""
+        missing = {
+            device["uid"]: device
+            for devices in device_list
+            if devices["type"] == "heat"
+            for device in devices["devices"]
+            if not device["operation"]
+        }
+        if not missing:
+            return
+        responses = await self.request_device_statuses(
+            [(uid, "heat") for uid in missing]
+        )
+        for uid, resp in responses.items():
+            if resp and resp["result"]:
+                missing[uid]["operation"] = resp["data"]
+
+    def seed_device_states(self):
+        """Start the state store off with the operations from home.do."""
         for devices in self.device_list:
-            if devices["type"] != "heat":
-                continue
             for device in devices["devices"]:
-                if device["operation"]:
-                    continue
-                resp = self.request_device_status(device["uid"], "heat")
-                if resp["result"]:
-                    device["operation"] = resp["data"]
+                if "uid" in device and "operation" in device:
+                    self.device_types[device["uid"]] = devices["type"]
+                    # heating zones fix_heat_datas() couldn't fill stay out
+                    if device["operation"]:
+                        self.async_store_state(device["uid"], device["operation"])
+
+    @callback
+    def async_store_state(self, uid, operation) -> bool:
+        """Store a device's full operation and its parsed state.
+
+        An operation that doesn't parse is dropped with a warning, keeping
+        the last good one; returns whether it was stored.
+        """
+        device_type = self.device_types.get(uid)
+        try:
+            state = parse_state(device_type, operation)
+        except InvalidState as err:
+            _LOGGER.warning("ignoring invalid state of %s: %s", uid, err)
+            return False
+        self.device_states[uid] = operation
+        if state is not None:
+            self.states[uid] = state
+        return True
+
+    @callback
+    def async_add_listener(self, update_callback, context=None):
+        """Listen for data updates, indexed by context for dispatch."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        self._listeners_by_context.setdefault(context, []).append(update_callback)
+
+        @callback
+        def remove_indexed_listener() -> None:
+            remove_listener()
+            callbacks = self._listeners_by_context[context]
+            callbacks.remove(update_callback)
+            if not callbacks:
+                del self._listeners_by_context[context]
+
+        return remove_indexed_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the listeners fed by the periodic poll.
+
+        Device entities are driven by websocket pushes through
+        async_update_devices(), so the poll (which only carries car data)
+        leaves them alone, except when it failed or recovered: every
+        entity's availability follows last_update_success.
+        """
+        if self.last_update_success != self._notified_success:
+            self._notified_success = self.last_update_success
+            super().async_update_listeners()
+            return
+        for context, callbacks in list(self._listeners_by_context.items()):
+            if context not in self.device_states:
+                for update_callback in list(callbacks):
+                    update_callback()
+
+    @callback
+    def async_update_devices(self, uids) -> None:
+        """Notify only the entities of the given device uids."""
+        delivered = 0
+        for uid in uids:
+            for update_callback in list(self._listeners_by_context.get(uid, ())):
+                update_callback()
+                delivered += 1
+        self.dispatch_stats["delivered"] += delivered
+        self.dispatch_stats["skipped"] += len(self._listeners) - delivered
 
     def send_notification(self, title, message, notification_id=None):
         """Send a notification to the user."""
@@ -227,53 +624,85 @@ class MyCoordinator(update_coordinator.DataUpdateCoordinator):
         expired cloud token, server hiccup), we back off and connect
         again. Expired keys are refreshed in-line, so there is no
         second task or event to get lost.
+
+        A socket silently dropped by a NAT never errors on its own, so
+        liveness is checked actively: keepalive pings must be answered
+        within the ping interval. Optionally (the silence timeout in the
+        integration options), a connection that delivered no frame for
+        that long is pinged once more, and replaced through _handover()
+        if that goes unanswered; a quiet home alone is no reason to drop
+        a connection that answers.
+
+        Every MAX_CONNECTION_AGE the connection is recycled
+        make-before-break: the replacement is opened and subscribed while
+        the old one keeps delivering, and only then is the old one
+        closed, so no push falls into the gap (see _handover()).
         """
-        url = "wss://smartelife.apt.co.kr/ws/data"
         retry_delay = 5
+        stats = self.websocket_stats
 
         while True:
             try:
-                # Refetch keys each iteration: a no-op while they are
-                # still tied to the current login session, a cheap
-                # refresh when a re-login elsewhere invalidated them.
-                self.websocket_keys = await self.hass.async_add_executor_job(
-                    self.credentials.websocket_keys_json
-                )
-                subscription = json.dumps(
-                    self.websocket_keys
-                    | {
-                        "data": [
-                            {"type": "light"},
-                            {"type": "heat"},
-                            {"type": "alloffswitch"},
-                            {"type": "smartdoor"},
-                            {"type": "aircon"},
-                            {"type": "wallsocket"},
-                            {"type": "vent"},
-                            {"type": "gas"},
-                            # {"type": "call"},
-                        ]
-                    }
+                websocket = await self._open_websocket()
+                retry_delay = 5  # reset after a successful connection
+                stats.connected()
+                if stats.connects > 1:
+                    # pushes sent while we were away are gone for good
+                    self._schedule_resync()
+                reader = self._start_reader(websocket)
+                connected_at = self.hass.loop.time()
+                silence_timeout = 60 * self.entry.options.get(
+                    CONF_SILENCE_TIMEOUT, DEFAULT_SILENCE_TIMEOUT
                 )
-
-                async with connect(url, ssl=self.ssl_context) as websocket:
-                    retry_delay = 5  # reset after a successful connection
-                    await websocket.send(subscription)
-                    try:
-                        async with asyncio.timeout(
-                            MAX_CONNECTION_AGE.total_seconds()
+                silence_checked_at = connected_at
+                try:
+                    while True:
+                        done, _ = await asyncio.wait(
+                            {reader}, timeout=WATCHDOG_INTERVAL.total_seconds()
+                        )
+                        if done:
+                            reason = reader.result()
+                            break
+                        stats.ping_latency = websocket.latency
+                        now = self.hass.loop.time()
+                        if (
+                            silence_timeout
+                            and now - silence_checked_at >= silence_timeout
+                            and stats.seconds_silent() >= silence_timeout
                         ):
-                            async for raw_message in websocket:
-                                message = json.loads(raw_message)
-                                if not self.handle_websocket_message(message):
-                                    # keys rejected: refresh and resubscribe
-                                    await self.refresh_websocket_keys(message)
-                                    break
-                    except TimeoutError:
+                            silence_checked_at = now
+                            if await self._answers_ping(websocket):
+                                continue
+                            _LOGGER.warning(
+                                "No websocket frame for %ss and no pong, "
+                                "replacing the connection",
+                                silence_timeout,
+                            )
+                            websocket, reader = await self._handover(websocket, reader)
+                            connected_at = silence_checked_at = self.hass.loop.time()
+                            stats.disconnected("silent")
+                            stats.connected()
+                            # the dead connection may have swallowed pushes
+                            self._schedule_resync()
+                            continue
+                        age = self.hass.loop.time() - connected_at
+                        if age < MAX_CONNECTION_AGE.total_seconds():
+                            continue
                         _LOGGER.debug("recycling websocket after max age")
-                        continue  # reconnect immediately, no backoff
-
-            except websockets.exceptions.ConnectionClosed:
+                        websocket, reader = await self._handover(websocket, reader)
+                        connected_at = self.hass.loop.time()
+                        stats.disconnected("max_age")
+                        stats.connected()
+                finally:
+                    reader.cancel()
+                    await websocket.close()
+
+            except websockets.exceptions.ConnectionClosed as err:
+                # the library fails the connection itself on a missed pong
+                if getattr(err.sent, "reason", None) == "keepalive ping timeout":
+                    reason = "ping_timeout"
+                else:
+                    reason = "connection_closed"
                 _LOGGER.debug(
                     "WebSocket connection closed, reconnecting in %ss...", retry_delay
                 )
@@ -283,18 +712,123 @@ class MyCoordinator(update_coordinator.DataUpdateCoordinator):
                 ssl.SSLError,
                 websockets.exceptions.WebSocketException,
             ) as err:
+                reason = "error"
                 _LOGGER.warning(
                     "WebSocket error (%s), reconnecting in %ss...", err, retry_delay
                 )
             except Exception:
+                reason = "error"
                 _LOGGER.exception(
                     "Unexpected error in websocket task, reconnecting in %ss...",
                     retry_delay,
                 )
 
+            stats.disconnected(reason, retry_delay)
             await asyncio.sleep(retry_delay)
             retry_delay = min(retry_delay * 2, 300)  # exponential backoff, max 5 min
 
+    async def _open_websocket(self):
+        """Connect to the push server and subscribe to every device type."""
+        await self._async_update_frame_recorder()
+        # Refetch keys for each connection: a no-op while they are still
+        # tied to the current login session, a cheap refresh when a
+        # re-login elsewhere invalidated them.
+        self.websocket_keys = await self.credentials.websocket_keys_json()
+        subscription = json.dumps(
+            self.websocket_keys
+            | {
+                "data": [{"type": device_type} for device_type in PUSH_TYPES]
+            }
+        )
+        ping_interval = self.entry.options.get(
+            CONF_PING_INTERVAL, DEFAULT_PING_INTERVAL
+        )
+        websocket = await connect(
+            WEBSOCKET_URL,
+            ssl=self.ssl_context,
+            ping_interval=ping_interval,
+            ping_timeout=ping_interval,
+        )
+        try:
+            await websocket.send(subscription)
+        except BaseException:
+            await websocket.close()
+            raise
+        return websocket
+
+    async def _answers_ping(self, websocket) -> bool:
+        """Whether the server answers a ping within the ping interval."""
+        timeout = self.entry.options.get(CONF_PING_INTERVAL, DEFAULT_PING_INTERVAL)
+        pong = await websocket.ping()
+        try:
+            async with asyncio.timeout(timeout):
+                await pong
+        except TimeoutError:
+            return False
+        return True
+
+    def _start_reader(self, websocket) -> asyncio.Task:
+        return self.hass.async_create_background_task(
+            self._read_websocket(websocket), "daelim-websocket-reader"
+        )
+
+    async def _read_websocket(self, websocket) -> str:
+        """Deliver a connection's frames until it ends, and return why."""
+        async for raw_message in websocket:
+            frame = self._decode_frame(raw_message)
+            if not self.handle_push_frame(frame):
+                # keys rejected: refresh and resubscribe
+                await self.refresh_websocket_keys(frame.message)
+                return "token_expired"
+        # the server closing the stream cleanly ends the iteration
+        return "connection_closed"
+
+    async def _handover(self, websocket, reader):
+        """Replace a connection with a fresh one without a gap in pushes.
+
+        Both connections deliver while the new one subscribes, so the same
+        push may arrive twice. That is harmless: pushes are merged into the
+        state store, and one that changes nothing writes nothing.
+        """
+        replacement = await self._open_websocket()
+        replacement_reader = self._start_reader(replacement)
+        try:
+            await websocket.close()
+            # let the old reader finish the frames it already had
+            await asyncio.gather(reader, return_exceptions=True)
+        except BaseException:
+            replacement_reader.cancel()
+            await replacement.close()
+            raise
+        return replacement, replacement_reader
+
+    def _decode_frame(self, raw_message):
+        """Count, record (if enabled) and decode a received frame."""
+        if isinstance(raw_message, str):
+            self.websocket_stats.received(len(raw_message.encode()))
+        else:
+            self.websocket_stats.received(len(raw_message))
+        if self._frame_recorder is not None:
+            secrets = [*(self.websocket_keys or {}).values()]
+            self._frame_recorder.record(
+                raw_message, secrets + [self.credentials.daelim_elife]
+            )
+        return decode_frame(raw_message)
+
+    async def _async_update_frame_recorder(self) -> None:
+        """Start or stop recording frames, as the options say."""
+        record = self.entry.options.get(CONF_RECORD_FRAMES, False)
+        if record and self._frame_recorder is None:
+            path = self.hass.config.path(FRAMES_FILE)
+            _LOGGER.info("recording websocket frames to %s", path)
+            self._frame_recorder = FrameRecorder(self.hass, path)
+            self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, self._frame_recorder.async_close
+            )
+        elif not record and self._frame_recorder is not None:
+            await self._frame_recorder.async_close()
+            self._frame_recorder = None
+
     async def refresh_websocket_keys(self, message):
         now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.send_notification(
@@ -306,31 +840,98 @@ class MyCoordinator(update_coordinator.DataUpdateCoordinator):
         # re-login here: a new login invalidates the other requests'
         # session, which would ping-pong invalidations between the
         # websocket and the control requests.
-        self.websocket_keys = await self.hass.async_add_executor_job(
-            self.credentials.websocket_keys_json, True
-        )
+        self.websocket_keys = await self.credentials.websocket_keys_json(True)
 
     def handle_websocket_message(self, message) -> bool:
-        """Handle an incoming WebSocket message.
+        """Handle an incoming, already parsed WebSocket message."""
+        return self.handle_push_frame(frame_from_message(message))
+
+    def handle_push_frame(self, frame) -> bool:
+        """Handle a decoded WebSocket frame.
 
         Return False when the server rejected our keys (anything but a
         normal status), signalling the caller to refresh and reconnect.
         """
-        has_normal_msg = (
-            "result" in message
-            and message["result"]["message"] == MESSAGE_WEBSOCKET_STATUS_NORMAL
-        ) or "action" in message
-
-        if not has_normal_msg:
-            _LOGGER.debug("Received websocket message: %s", message)
+        if not frame.normal:
+            _LOGGER.debug("Received websocket message: %s", frame.message)
             return False
 
-        if "data" in message:
-            processed_message = {}
-            _LOGGER.debug("websocket message data: %s", message["data"])
-            devices = message["data"].get("devices", [])
-            for device in devices:
-                processed_message[device["uid"]] = device.get("operation", {})
-            self.async_set_updated_data(processed_message)
+        if frame.devices is not None:
+            _LOGGER.debug("websocket message devices: %s", frame.devices)
+            self.async_merge_operations(frame.devices)
 
         return True
+
+    @callback
+    def async_merge_operations(self, operations, pushed=True) -> None:
+        """Merge reported (uid, operation) pairs into the state store.
+
+        Only pushes (pushed=True) confirm or reject optimistic state; a
+        polled status may predate the command it would be matched with.
+        """
+        updated = set()
+        for uid, operation in operations:
+            if pushed:
+                operation = self._optimistic.async_push(uid, operation)
+                if self._resync_pushed is not None:
+                    self._resync_pushed.add(uid)
+            previous = self.device_states.get(uid)
+            # Merge rather than replace: a push may carry only the
+            # fields that changed.
+            merged = (previous or {}) | operation
+            if merged == previous:
+                # The server re-sends full device state freely; an
+                # identical payload must not cost a state write.
+                self.dispatch_stats["unchanged"] += 1
+                continue
+            if self.async_store_state(uid, merged):
+                updated.add(uid)
+        self.async_update_devices(updated)
+
+    @callback
+    def _schedule_resync(self) -> None:
+        """Resync device states in the background, unless already doing so."""
+        if self._resync is None or self._resync.done():
+            self._resync = self.hass.async_create_background_task(
+                self._async_resync(), "daelim-resync"
+            )
+
+    async def _async_resync(self) -> None:
+        """Fetch the status of every pushed device and merge it in.
+
+        Pushes sent while the websocket was down are lost for good, so
+        after a reconnect the store is brought up to date from
+        /controls/device/status.ajax instead of waiting for each device
+        to change again.
+
+        Each status is merged as soon as it arrives, unless the device
+        was pushed since the resync started, or has a command awaiting
+        confirmation: either is newer than what the status can tell.
+        """
+        started = self.hass.loop.time()
+        devices = [
+            (uid, device_type)
+            for uid, device_type in self.device_types.items()
+            if device_type in PUSH_TYPES
+        ]
+
+        @callback
+        def merge(uid, response):
+            if not (response and response["result"] and response.get("data")):
+                return
+            if uid in self._resync_pushed or self._optimistic.is_pending(uid):
+                return
+            self.async_merge_operations([(uid, response["data"])], pushed=False)
+
+        self._resync_pushed = set()
+        try:
+            responses = await self.request_device_statuses(devices, merge)
+        finally:
+            self._resync_pushed = None
+        self.websocket_stats.resyncs += 1
+        _LOGGER.debug(
+            "resynced %d of %d devices in %.1fs",
+            sum(1 for response in responses.values() if response),
+            len(devices),
+            self.hass.loop.time() - started,
+        )
@@ -37,6 +37,7 @@ async def async_setup_entry(
             entities += [
                 DaelimDoorSensor(device_data, coordinator)
                 for device_data in devices["devices"]
+                if device_data["uid"] in coordinator.states
             ]
         if devices["type"] == "car":
             entities += [
@@ -47,6 +48,7 @@ async def async_setup_entry(
             entities += [
                 DaelimGasSensor(device_data, coordinator)
                 for device_data in devices["devices"]
+                if device_data["uid"] in coordinator.states
             ]
 
     async_add_entities(entities)
@@ -64,10 +66,11 @@ class DaelimDoorSensor(CoordinatorEntity, BinarySensorEntity):
         self._attr_name = "DoorLock"
         self._group = get_location(device_data)
 
+        state = coordinator.states[self.uid]
         self._attr_device_class = BinarySensorDeviceClass.DOOR
-        self._attr_is_on = device_data["operation"]["status"] == "open"
+        self._attr_is_on = state.is_open
         self._attr_extra_state_attributes = {
-            "battery": int(device_data["operation"]["battery"]),
+            "battery": state.battery,
             "low_battery": "n",
         }
 
@@ -86,9 +89,10 @@ class DaelimDoorSensor(CoordinatorEntity, BinarySensorEntity):
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        data = self.coordinator.data
-        if self.uid in data:
-            self._attr_is_on = data[self.uid]["status"] == "open"
+        state = self.coordinator.states.get(self.uid)
+        if state is not None:
+            self._attr_is_on = state.is_open
+            self._attr_extra_state_attributes["battery"] = state.battery
             self.async_write_ha_state()
 
 
@@ -110,7 +114,7 @@ class DaelimGasSensor(CoordinatorEntity, BinarySensorEntity):
         self._group = get_location(device_data)
 
         self._attr_device_class = BinarySensorDeviceClass.OPENING
-        self._attr_is_on = device_data["operation"]["status"] == "open"
+        self._attr_is_on = coordinator.states[self.uid].is_open
 
     @property
     def unique_id(self) -> str:
@@ -129,9 +133,9 @@ class DaelimGasSensor(CoordinatorEntity, BinarySensorEntity):
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        data = self.coordinator.data
-        if self.uid in data:
-            self._attr_is_on = data[self.uid]["status"] == "open"
+        state = self.coordinator.states.get(self.uid)
+        if state is not None:
+            self._attr_is_on = state.is_open
             self.async_write_ha_state()
 
 
@@ -67,7 +67,7 @@ class DaelimElevatorCallButton(CoordinatorEntity, ButtonEntity):
             manufacturer="Daelim Smarthome",
         )
 
-    def press(self) -> None:
+    async def async_press(self) -> None:
         """Handle the button press."""
         body = {
             "header": {
@@ -77,4 +77,4 @@ class DaelimElevatorCallButton(CoordinatorEntity, ButtonEntity):
             },
             "data": {"uid": self.uid, "operation": {"control": "down"}},
         }
-        _response = self.coordinator.request_ajax("/common/data.ajax", body)
+        _response = await self.coordinator.request_ajax("/common/data.ajax", body)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 from homeassistant.components.climate import ClimateEntity
@@ -25,6 +26,7 @@ from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature, PRECISION_W
 
 from .helper import get_location
 from .const import DOMAIN
+from .states import Aircon, Heat
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -51,13 +53,13 @@ async def async_setup_entry(
             entities += [
                 DaelimHeating(device_data, coordinator)
                 for device_data in devices["devices"]
-                if device_data["operation"]
+                if device_data["uid"] in coordinator.states
             ]
         elif devices["type"] == "aircon":
             entities += [
                 DaelimAC(device_data, coordinator)
                 for device_data in devices["devices"]
-                if device_data["operation"]
+                if device_data["uid"] in coordinator.states
             ]
 
     async_add_entities(entities)
@@ -75,24 +77,13 @@ class DaelimHeating(CoordinatorEntity, ClimateEntity):
         self._name = "{} Heating".format(get_location(device_data))
         self._group = get_location(device_data)
         self._type = device_data["operation"]["type"]
-        self._attr_current_temperature = int(device_data["operation"]["current_temp"])
-        self._attr_target_temperature = int(device_data["operation"]["set_temp"])
+        self._apply_state(coordinator.states[self.uid])
 
         self._attr_temperature_unit = UnitOfTemperature.CELSIUS
         self._attr_precision = PRECISION_WHOLE
         self._attr_hvac_modes = [HVACMode.OFF, HVACMode.HEAT]
         self._attr_preset_modes = [PRESET_NONE, PRESET_AWAY]
 
-        self._attr_hvac_mode = (
-            HVACMode.HEAT
-            if device_data["operation"]["control"] == "on"
-            else HVACMode.OFF
-        )
-
-        self._attr_preset_mode = (
-            PRESET_AWAY if device_data["operation"]["mode"] == "out" else PRESET_NONE
-        )
-
         self._attr_supported_features = (
             ClimateEntityFeature.TURN_OFF
             | ClimateEntityFeature.TURN_ON
@@ -125,94 +116,85 @@ class DaelimHeating(CoordinatorEntity, ClimateEntity):
             identifiers={(DOMAIN, self._group)},
         )
 
-    def set_temperature(self, **kwargs: Any):
+    async def async_set_temperature(self, **kwargs: Any):
         """Set new target temperature."""
         temp = kwargs.get(ATTR_TEMPERATURE)
         if temp and self._attr_target_temperature == int(temp):
             return
         if self._attr_hvac_mode == HVACMode.OFF:
-            self.turn_on()
-        self.control_set_temperature(temp)
+            # queued together, so both travel in one coalesced request
+            await asyncio.gather(
+                self.async_turn_on(), self.async_control_set_temperature(temp)
+            )
+            return
+        await self.async_control_set_temperature(temp)
 
-    def set_hvac_mode(self, hvac_mode):
+    async def async_set_hvac_mode(self, hvac_mode):
         """Set new target hvac mode."""
         if self._attr_hvac_mode == hvac_mode:
             return
         if hvac_mode == HVACMode.HEAT:
-            self.turn_on()
+            await self.async_turn_on()
         elif hvac_mode == HVACMode.OFF:
-            self.turn_off()
-        self._attr_hvac_mode = hvac_mode
+            await self.async_turn_off()
 
-    def set_preset_mode(self, preset_mode):
+    async def async_set_preset_mode(self, preset_mode):
         """Set new target preset mode."""
         if preset_mode == self._attr_preset_mode:
             return
         if self._attr_hvac_mode == HVACMode.OFF:
-            self.turn_on()
-        self.control_set_mode(preset_mode)
-
-    def control_set_mode(self, preset_mode):
-        body = {
-            "type": self._type,
-            "uid": self.uid,
-            "operation": {"mode": "out" if preset_mode == PRESET_AWAY else "heat"},
-        }
-
-        response = self.coordinator.request_ajax("/device/control.ajax", body)
-        if response["result"]:
-            self._attr_preset_mode = preset_mode
-
-        self.schedule_update_ha_state()
-
-    def control_set_temperature(self, temp):
-        body = {
-            "type": self._type,
-            "uid": self.uid,
-            "operation": {"set_temp": str(temp)},
-        }
+            await asyncio.gather(
+                self.async_turn_on(), self.async_control_set_mode(preset_mode)
+            )
+            return
+        await self.async_control_set_mode(preset_mode)
 
-        response = self.coordinator.request_ajax("/device/control.ajax", body)
-        if response["result"]:
-            self._attr_target_temperature = int(temp)
+    async def async_control_set_mode(self, preset_mode):
+        mode = "out" if preset_mode == PRESET_AWAY else "heat"
+        await self.coordinator.async_control(
+            self.uid, self._type, {"mode": mode}, expected={"mode": mode}
+        )
 
-        self.schedule_update_ha_state()
+    async def async_control_set_temperature(self, temp):
+        await self.coordinator.async_control(
+            self.uid,
+            self._type,
+            {"set_temp": str(temp)},
+            expected={"set_temp": str(int(temp))},
+        )
 
-    def turn_on(self, **kwargs: Any) -> None:
+    async def async_turn_on(self, **kwargs: Any) -> None:
         """Instruct the heating system to turn on."""
-        body = {"type": self._type, "uid": self.uid, "operation": {"control": "on"}}
-
-        response = self.coordinator.request_ajax("/device/control.ajax", body)
-        if response["result"]:
-            self._attr_hvac_mode = HVACMode.HEAT
-
-        self.schedule_update_ha_state()
+        await self.coordinator.async_control(
+            self.uid,
+            self._type,
+            {"control": "on"},
+            expected={"control": "on"},
+        )
 
-    def turn_off(self, **kwargs: Any) -> None:
+    async def async_turn_off(self, **kwargs: Any) -> None:
         """Instruct the heating system to turn off."""
-        body = {"type": self._type, "uid": self.uid, "operation": {"control": "off"}}
-
-        response = self.coordinator.request_ajax("/device/control.ajax", body)
-        if response["result"]:
-            self._attr_hvac_mode = HVACMode.OFF
-
-        self.schedule_update_ha_state()
+        await self.coordinator.async_control(
+            self.uid,
+            self._type,
+            {"control": "off"},
+            expected={"control": "off"},
+        )
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        data = self.coordinator.data
-        if self.uid in data:
-            operation = data[self.uid]
-            self._attr_hvac_mode = (
-                HVACMode.HEAT if operation["control"] == "on" else HVACMode.OFF
-            )
-            self._attr_preset_mode = PRESET_AWAY if operation["mode"] == "out" else None
-            self._attr_current_temperature = int(operation["current_temp"])
-            self._attr_target_temperature = int(operation["set_temp"])
-
+        state = self.coordinator.states.get(self.uid)
+        if state is not None:
+            self._apply_state(state)
             self.async_write_ha_state()
 
+    def _apply_state(self, state: Heat) -> None:
+        self._attr_hvac_mode = HVACMode.HEAT if state.is_on else HVACMode.OFF
+        self._attr_preset_mode = PRESET_AWAY if state.away else PRESET_NONE
+        self._attr_current_temperature = state.current_temp
+        self._attr_target_temperature = state.set_temp
+
 
 class DaelimAC(CoordinatorEntity, ClimateEntity):
     """Representation of an Daelim AC."""
@@ -226,14 +208,7 @@ class DaelimAC(CoordinatorEntity, ClimateEntity):
         self._name = "{} AC".format(get_location(device_data))
         self._group = get_location(device_data)
         self._type = device_data["operation"]["type"]
-
-        self._attr_current_temperature = self.parse_temp(
-            device_data["operation"]["current_temp"]
-        )
-
-        self._attr_target_temperature = self.parse_temp(
-            device_data["operation"]["set_temp"]
-        )
+        self._apply_state(coordinator.states[self.uid])
 
         self._attr_temperature_unit = UnitOfTemperature.CELSIUS
         self._attr_precision = PRECISION_WHOLE
@@ -244,15 +219,6 @@ class DaelimAC(CoordinatorEntity, ClimateEntity):
             HVACMode.AUTO,
             HVACMode.FAN_ONLY,
         ]
-
-        self._attr_hvac_mode = (
-            HVACMode.OFF
-            if device_data["operation"]["status"] == "off"
-            else STR_TO_HVAC[device_data["operation"]["mode"]]
-        )
-
-        fan_speed = device_data["operation"]["wind_speed"]
-        self._attr_fan_mode = fan_speed if fan_speed else None
         self._attr_fan_modes = [FAN_LOW, FAN_MEDIUM, FAN_HIGH, FAN_AUTO]
 
         self._attr_supported_features = (
@@ -287,114 +253,92 @@ class DaelimAC(CoordinatorEntity, ClimateEntity):
             identifiers={(DOMAIN, self._group)},
         )
 
-    def parse_temp(self, temp):
-        temp = int(temp)
-        if temp in [-1, 255]:
-            return None
-        return temp
-
-    def set_temperature(self, **kwargs: Any):
+    async def async_set_temperature(self, **kwargs: Any):
         """Set new target temperature."""
         temp = kwargs.get(ATTR_TEMPERATURE)
         if temp and self._attr_target_temperature == int(temp):
             return
         if self._attr_hvac_mode == HVACMode.OFF:
-            self.turn_on()
-        self.control_set_temperature(temp)
+            await asyncio.gather(
+                self.async_turn_on(), self.async_control_set_temperature(temp)
+            )
+            return
+        await self.async_control_set_temperature(temp)
 
-    def set_hvac_mode(self, hvac_mode):
+    async def async_set_hvac_mode(self, hvac_mode):
         """Set new target hvac mode."""
         if self._attr_hvac_mode == hvac_mode:
             return
         if hvac_mode == HVACMode.OFF:
-            self.turn_off()
+            await self.async_turn_off()
             return
 
         if self._attr_hvac_mode == HVACMode.OFF:
-            self.turn_on()
-        self.control_set_mode(hvac_mode)
+            await asyncio.gather(
+                self.async_turn_on(), self.async_control_set_mode(hvac_mode)
+            )
+            return
+        await self.async_control_set_mode(hvac_mode)
 
-    def set_fan_mode(self, fan_mode):
+    async def async_set_fan_mode(self, fan_mode):
         """Set new target fan mode."""
         if self._attr_fan_mode == fan_mode:
             return
         if self._attr_hvac_mode == HVACMode.OFF:
-            self.turn_on()
-        self.control_set_fan(fan_mode)
-
-    def control_set_mode(self, mode):
-        body = {
-            "type": self._type,
-            "uid": self.uid,
-            "operation": {"mode": HVAC_TO_STR[mode]},
-        }
-
-        response = self.coordinator.request_ajax("/device/control.ajax", body)
-        if response["result"]:
-            self._attr_hvac_mode = mode
-
-        self.schedule_update_ha_state()
-
-    def control_set_fan(self, fan_mode):
-        body = {
-            "type": self._type,
-            "uid": self.uid,
-            "operation": {"wind_speed": fan_mode},
-        }
-
-        response = self.coordinator.request_ajax("/device/control.ajax", body)
-        if response["result"]:
-            self._attr_fan_mode = fan_mode
-
-        self.schedule_update_ha_state()
+            await asyncio.gather(
+                self.async_turn_on(), self.async_control_set_fan(fan_mode)
+            )
+            return
+        await self.async_control_set_fan(fan_mode)
 
-    def control_set_temperature(self, temp):
-        body = {
-            "type": self._type,
-            "uid": self.uid,
-            "operation": {"set_temp": str(temp)},
-        }
+    async def async_control_set_mode(self, mode):
+        operation = {"mode": HVAC_TO_STR[mode]}
+        await self.coordinator.async_control(
+            self.uid, self._type, operation, expected=operation
+        )
 
-        response = self.coordinator.request_ajax("/device/control.ajax", body)
-        if response["result"]:
-            self._attr_target_temperature = int(temp)
+    async def async_control_set_fan(self, fan_mode):
+        operation = {"wind_speed": fan_mode}
+        await self.coordinator.async_control(
+            self.uid, self._type, operation, expected=operation
+        )
 
-        self.schedule_update_ha_state()
+    async def async_control_set_temperature(self, temp):
+        await self.coordinator.async_control(
+            self.uid,
+            self._type,
+            {"set_temp": str(temp)},
+            expected={"set_temp": str(int(temp))},
+        )
 
-    def turn_on(self, **kwargs: Any) -> None:
+    async def async_turn_on(self, **kwargs: Any) -> None:
         """Instruct the AC system to turn on."""
-        body = {"type": self._type, "uid": self.uid, "operation": {"control": "on"}}
-
-        response = self.coordinator.request_ajax("/device/control.ajax", body)
-        if response["result"]:
-            self._attr_hvac_mode = HVACMode.AUTO
-
-        self.schedule_update_ha_state()
+        await self.coordinator.async_control(
+            self.uid,
+            self._type,
+            {"control": "on"},
+            expected={"status": "on"},
+        )
 
-    def turn_off(self, **kwargs: Any) -> None:
+    async def async_turn_off(self, **kwargs: Any) -> None:
         """Instruct the AC system to turn off."""
-        body = {"type": self._type, "uid": self.uid, "operation": {"control": "off"}}
-
-        response = self.coordinator.request_ajax("/device/control.ajax", body)
-        if response["result"]:
-            self._attr_hvac_mode = HVACMode.OFF
-
-        self.schedule_update_ha_state()
+        await self.coordinator.async_control(
+            self.uid,
+            self._type,
+            {"control": "off"},
+            expected={"status": "off"},
+        )
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        data = self.coordinator.data
-        if self.uid in data:
-            operation = data[self.uid]
-            self._attr_hvac_mode = (
-                HVACMode.OFF
-                if operation["status"] == "off"
-                else STR_TO_HVAC[operation["mode"]]
-            )
-            fan = operation["wind_speed"]
-            self._attr_fan_mode = fan if fan else None
-            self._attr_current_temperature = self.parse_temp(operation["current_temp"])
-            self._attr_target_temperature = self.parse_temp(operation["set_temp"])
-
+        state = self.coordinator.states.get(self.uid)
+        if state is not None:
+            self._apply_state(state)
             self.async_write_ha_state()
+
+    def _apply_state(self, state: Aircon) -> None:
+        self._attr_hvac_mode = STR_TO_HVAC[state.mode] if state.is_on else HVACMode.OFF
+        self._attr_fan_mode = state.wind_speed
+        self._attr_current_temperature = state.current_temp
+        self._attr_target_temperature = state.set_temp
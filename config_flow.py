@@ -3,18 +3,24 @@
 from __future__ import annotations
 
 import logging
-import requests
 from typing import Any
 import json
 
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN
+from .const import (
+    CONF_PING_INTERVAL,
+    CONF_RECORD_FRAMES,
+    CONF_SILENCE_TIMEOUT,
+    DEFAULT_PING_INTERVAL,
+    DEFAULT_SILENCE_TIMEOUT,
+    DOMAIN,
+)
 from .helper import Credentials
 
 _LOGGER = logging.getLogger(__name__)
@@ -34,8 +40,8 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]):
     """
     credentials = Credentials(data["email"], data["password"])
     try:
-        await hass.async_add_executor_job(credentials.login)
-        await hass.async_add_executor_job(credentials.websocket_keys_json)
+        await credentials.login()
+        await credentials.websocket_keys_json()
     except:
         raise InvalidAuth
 
@@ -54,6 +60,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return OptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -80,6 +94,44 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class OptionsFlow(config_entries.OptionsFlow):
+    """Push connection settings, applied from the next connection."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        # Not self.config_entry: only Home Assistant 2024.11+ sets that
+        # itself, and from then on assigning it is deprecated.
+        self.entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.entry.options
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_PING_INTERVAL,
+                    default=options.get(CONF_PING_INTERVAL, DEFAULT_PING_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=300)),
+                vol.Required(
+                    CONF_SILENCE_TIMEOUT,
+                    default=options.get(
+                        CONF_SILENCE_TIMEOUT, DEFAULT_SILENCE_TIMEOUT
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=24 * 60)),
+                vol.Required(
+                    CONF_RECORD_FRAMES,
+                    default=options.get(CONF_RECORD_FRAMES, False),
+                ): bool,
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema)
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
@@ -5,6 +5,9 @@ from datetime import timedelta
 DOMAIN = "daelim_smarthome"
 
 API_PREFIX = "https://smartelife.apt.co.kr"
+WEBSOCKET_URL = "wss://smartelife.apt.co.kr/ws/data"
+# The push server's status message for frames it accepted.
+MESSAGE_WEBSOCKET_STATUS_NORMAL = "정상"
 
 # The first request tries the pooled connection and fails fast: a socket
 # silently dropped during idle should not eat the whole budget. The retry
@@ -16,6 +19,23 @@ READ_TIMEOUT = 15
 RETRY = 3
 
 REFRESH_INTERVAL = timedelta(minutes=10)
+# The coordinator slides the session in the background up to this much
+# before REFRESH_INTERVAL runs out, so requests never find it due.
+REFRESH_JITTER = timedelta(minutes=1)
+
+# Push connection liveness, both adjustable in the integration options:
+# keepalive pings every CONF_PING_INTERVAL seconds (each must be answered
+# within as long), and, opt-in, an extra ping and a make-before-break
+# replacement when no frame at all arrived for CONF_SILENCE_TIMEOUT
+# minutes (0 = off). A home can be quiet all night, so silence alone
+# never drops a connection.
+CONF_PING_INTERVAL = "ping_interval"
+CONF_SILENCE_TIMEOUT = "silence_timeout"
+DEFAULT_PING_INTERVAL = 20
+DEFAULT_SILENCE_TIMEOUT = 0
+
+# Record the push frames to a file for offline replay (see frames.py).
+CONF_RECORD_FRAMES = "record_frames"
 
 BS = 256 // 16
 KEY = b"\x31\x32\x33\x34\x35\x36\x37\x38\x39\x30\x31\x32\x33\x34\x35\x36\x37\x38\x39\x30\x31\x32\x33\x34\x35\x36\x37\x38\x39\x30\x31\x32"
@@ -0,0 +1,300 @@
+"""Control command dispatch for the daelim-smarthome integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+# A command waits this long for more commands to the same device before
+# it goes out, but never longer than COALESCE_MAX_DELAY in total, so a
+# slider dragged for a while still sends something.
+COALESCE_WINDOW = timedelta(milliseconds=300)
+COALESCE_MAX_DELAY = timedelta(seconds=1)
+
+# How long an optimistic state waits for the websocket to confirm it
+# before it is rolled back.
+CONFIRM_TIMEOUT = timedelta(seconds=10)
+
+
+class _PendingControl:
+    """The merged operation waiting to be sent to one device."""
+
+    __slots__ = ("device_type", "operation", "future", "timer", "started_at")
+
+    def __init__(self, device_type, future, started_at) -> None:
+        self.device_type = device_type
+        self.operation = {}
+        self.future = future
+        self.timer = None
+        self.started_at = started_at
+
+
+class ControlQueue:
+    """Coalesces /device/control.ajax operations per device.
+
+    Dragging a thermostat slider fires a burst of set_temperature calls.
+    Operations for the same uid arriving within COALESCE_WINDOW of each
+    other are merged (last write wins per field, so mode and temperature
+    travel together) and sent as one request, whose response every caller
+    in the burst gets.
+
+    A device has at most one request in flight: a burst that is due while
+    the previous one is still being sent (or retried) keeps merging and
+    goes out once that request finished, so the server can't apply them
+    out of order.
+    """
+
+    def __init__(self, hass: HomeAssistant, request_ajax, on_send) -> None:
+        self._hass = hass
+        self._request_ajax = request_ajax
+        self._on_send = on_send
+        self._pending: dict[str, _PendingControl] = {}
+        # uids with a request in flight
+        self._sending: set[str] = set()
+
+    async def async_control(self, uid, device_type, operation):
+        """Queue an operation for a device and return the server response."""
+        loop = self._hass.loop
+        pending = self._pending.get(uid)
+        if pending is None:
+            pending = _PendingControl(device_type, loop.create_future(), loop.time())
+            self._pending[uid] = pending
+        elif pending.timer is not None:
+            pending.timer.cancel()
+        pending.operation |= operation
+
+        delay = min(
+            COALESCE_WINDOW.total_seconds(),
+            pending.started_at + COALESCE_MAX_DELAY.total_seconds() - loop.time(),
+        )
+        pending.timer = loop.call_later(max(delay, 0), self._flush, uid)
+        # shielded: one cancelled caller must not cancel the whole burst
+        return await asyncio.shield(pending.future)
+
+    @callback
+    def _flush(self, uid) -> None:
+        pending = self._pending[uid]
+        pending.timer = None
+        if uid in self._sending:
+            # due, but waits for the request in flight (see _async_send)
+            return
+        del self._pending[uid]
+        self._sending.add(uid)
+        self._hass.async_create_task(
+            self._async_send(uid, pending), f"daelim-control-{uid}"
+        )
+
+    async def _async_send(self, uid, pending: _PendingControl) -> None:
+        body = {
+            "type": pending.device_type,
+            "uid": uid,
+            "operation": pending.operation,
+        }
+        _LOGGER.debug("sending control: %s", body)
+        self._on_send(uid)
+        try:
+            response = await self._request_ajax("/device/control.ajax", body)
+        except Exception as err:  # noqa: BLE001
+            pending.future.set_exception(err)
+        else:
+            pending.future.set_result(response)
+        finally:
+            self._sending.discard(uid)
+            waiting = self._pending.get(uid)
+            if waiting is not None and waiting.timer is None:
+                self._flush(uid)
+
+
+class _PendingConfirmation:
+    """Optimistic fields of one device, waiting for a push to confirm them."""
+
+    __slots__ = (
+        "device_type",
+        "expected",
+        "previous",
+        "applied_at",
+        "sent_at",
+        "timer",
+    )
+
+    def __init__(self, device_type, applied_at) -> None:
+        self.device_type = device_type
+        self.expected = {}
+        # the stored values the optimistic ones replaced, None if absent
+        self.previous = {}
+        self.applied_at = applied_at
+        # when the command carrying each expected field actually went out,
+        # after any coalescing; fields still queued are missing
+        self.sent_at = {}
+        self.timer = None
+
+
+class OptimisticStates:
+    """Optimistic device state, confirmed or rolled back by pushes.
+
+    A command writes the operation fields it expects to cause into the
+    coordinator's state store (through store_state) right away, so
+    entities render the new state before the cloud even answers. The
+    websocket push reporting those fields confirms them. A failed command,
+    or no confirmation within CONFIRM_TIMEOUT, restores the previous
+    values. A push that reports other values for them is the server's
+    answer and simply wins.
+
+    Fields are tracked one by one, and a push is only matched against
+    those whose command has gone out: a push answering "turn on" still
+    carries the old setpoint of a set_temperature queued behind it, and
+    must neither settle nor overwrite that.
+
+    Every confirmation records the time from the request going out to the
+    push arriving in command_latency, keyed by device type.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        device_states,
+        store_state,
+        update_devices,
+        command_latency,
+    ) -> None:
+        self._hass = hass
+        self._device_states = device_states
+        self._store_state = store_state
+        self._update_devices = update_devices
+        self._command_latency = command_latency
+        self._pending: dict[str, _PendingConfirmation] = {}
+
+    @callback
+    def async_apply(self, uid, device_type, expected) -> None:
+        """Show expected operation fields for a device until confirmed."""
+        loop = self._hass.loop
+        pending = self._pending.get(uid)
+        if pending is None:
+            pending = _PendingConfirmation(device_type, loop.time())
+            self._pending[uid] = pending
+        else:
+            pending.timer.cancel()
+        state = self._device_states.get(uid, {})
+        for key in expected:
+            if key not in pending.expected:
+                pending.previous[key] = state.get(key)
+            # a new command for the field: wait for it to go out
+            pending.sent_at.pop(key, None)
+        pending.expected |= expected
+        pending.timer = loop.call_later(
+            CONFIRM_TIMEOUT.total_seconds(), self._async_expire, uid
+        )
+
+        if self._store_state(uid, state | expected):
+            self._update_devices({uid})
+
+    def is_pending(self, uid) -> bool:
+        """Whether a device shows optimistic state awaiting confirmation."""
+        return uid in self._pending
+
+    @callback
+    def async_sent(self, uid) -> None:
+        """Note that the queued command(s) for a device have been sent.
+
+        Every field applied before this is part of what went out, as
+        commands to a device are merged until they are sent.
+        """
+        pending = self._pending.get(uid)
+        if pending is None:
+            return
+        now = self._hass.loop.time()
+        for key in pending.expected:
+            pending.sent_at.setdefault(key, now)
+
+    @callback
+    def async_push(self, uid, operation) -> dict:
+        """Match a pushed operation against what a device is expected to do.
+
+        Called before the push is merged into device_states; returns the
+        operation to merge, without the fields still shown optimistically.
+        """
+        pending = self._pending.get(uid)
+        if pending is None:
+            return operation
+        confirmed = {}
+        for key, value in operation.items():
+            if key not in pending.sent_at:
+                continue
+            if str(pending.expected[key]) == str(value):
+                confirmed[key] = pending.sent_at[key]
+            else:
+                _LOGGER.debug(
+                    "%s reported %s=%s, not %s", uid, key, value, pending.expected[key]
+                )
+            self._settle(pending, key)
+        if confirmed:
+            latency = self._hass.loop.time() - max(confirmed.values())
+            self._command_latency.record(pending.device_type, latency)
+            _LOGGER.debug("%s confirmed %s in %.3fs", uid, list(confirmed), latency)
+        if not pending.expected:
+            self._finish(uid)
+            return operation
+        held = {
+            key: value for key, value in operation.items() if key in pending.expected
+        }
+        if not held:
+            return operation
+        # a later rollback restores what the server says now
+        pending.previous |= held
+        return {
+            key: value
+            for key, value in operation.items()
+            if key not in pending.expected
+        }
+
+    @callback
+    def async_reject(self, uid, expected) -> None:
+        """Roll back the fields of a command that failed, right away."""
+        pending = self._pending.get(uid)
+        if pending is None:
+            return
+        previous = {
+            key: pending.previous[key] for key in expected if key in pending.expected
+        }
+        for key in previous:
+            self._settle(pending, key)
+        if not pending.expected:
+            self._finish(uid)
+        self._rollback(uid, previous)
+
+    @callback
+    def _async_expire(self, uid) -> None:
+        pending = self._finish(uid)
+        _LOGGER.warning(
+            "%s did not confirm %s within %.1fs, rolling back",
+            uid,
+            pending.expected,
+            self._hass.loop.time() - pending.applied_at,
+        )
+        self._rollback(uid, pending.previous)
+
+    @staticmethod
+    def _settle(pending: _PendingConfirmation, key) -> None:
+        del pending.expected[key]
+        del pending.previous[key]
+        pending.sent_at.pop(key, None)
+
+    def _finish(self, uid) -> _PendingConfirmation:
+        pending = self._pending.pop(uid)
+        pending.timer.cancel()
+        return pending
+
+    def _rollback(self, uid, previous) -> None:
+        state = dict(self._device_states.get(uid, {}))
+        for key, value in previous.items():
+            if value is None:
+                state.pop(key, None)
+            else:
+                state[key] = value
+        if self._store_state(uid, state):
+            self._update_devices({uid})
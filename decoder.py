@@ -0,0 +1,113 @@
+"""Websocket frame decoding for the daelim-smarthome integration.
+
+Frames look like
+
+    {"result": {"status": true, "message": "정상"}}
+    {"action": "...", "data": {"devices": [{"uid": "...", "operation": {...}}]}}
+
+and only the status message, whether there is an action, and the
+(uid, operation) pairs matter. With msgspec installed, a frame is decoded
+straight into that shape against typed structs, skipping every field
+nothing reads; otherwise orjson (which Home Assistant ships) or the
+stdlib json module parse it into dicts that are walked once.
+"""
+
+from __future__ import annotations
+
+import json
+
+from .const import MESSAGE_WEBSOCKET_STATUS_NORMAL
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class PushFrame:
+    """What the coordinator needs from one websocket frame."""
+
+    __slots__ = ("normal", "devices", "message")
+
+    def __init__(self, normal, devices, message) -> None:
+        # a normal status or an action, rather than a rejection of our keys
+        self.normal = normal
+        # the (uid, operation) pairs the frame reports, None without data
+        self.devices = devices
+        # the frame as received, for logs and notifications
+        self.message = message
+
+
+def frame_from_message(message) -> PushFrame:
+    """Extract a PushFrame from an already parsed frame."""
+    result = message.get("result")
+    normal = (
+        isinstance(result, dict)
+        and result.get("message") == MESSAGE_WEBSOCKET_STATUS_NORMAL
+    ) or "action" in message
+    devices = None
+    if "data" in message:
+        devices = [
+            (device["uid"], device.get("operation", {}))
+            for device in message["data"].get("devices", [])
+        ]
+    return PushFrame(normal, devices, message)
+
+
+def decode_with_json(raw_message) -> PushFrame:
+    return frame_from_message(json.loads(raw_message))
+
+
+decode_with_orjson = None
+if orjson is not None:
+
+    def decode_with_orjson(raw_message) -> PushFrame:
+        return frame_from_message(orjson.loads(raw_message))
+
+
+decode_with_msgspec = None
+if msgspec is not None:
+
+    class _Result(msgspec.Struct):
+        message: str | None = None
+
+    class _Device(msgspec.Struct):
+        uid: str
+        operation: dict = {}
+
+    class _Data(msgspec.Struct):
+        devices: list[_Device] = []
+
+    class _Frame(msgspec.Struct):
+        result: _Result | None = None
+        action: object = msgspec.UNSET
+        data: _Data | None = None
+
+    _FRAME_DECODER = msgspec.json.Decoder(_Frame)
+
+    def decode_with_msgspec(raw_message) -> PushFrame:
+        try:
+            frame = _FRAME_DECODER.decode(raw_message)
+        except msgspec.ValidationError:
+            # not the shape we know; let the generic path make sense of it
+            return decode_with_json(raw_message)
+        normal = (
+            frame.result is not None
+            and frame.result.message == MESSAGE_WEBSOCKET_STATUS_NORMAL
+        ) or frame.action is not msgspec.UNSET
+        devices = None
+        if frame.data is not None:
+            devices = [
+                (device.uid, device.operation) for device in frame.data.devices
+            ]
+        return PushFrame(normal, devices, raw_message)
+
+
+# the fastest decoder available
+decode_frame = decode_with_msgspec or decode_with_orjson or decode_with_json
+DECODER = decode_frame.__name__.removeprefix("decode_with_")
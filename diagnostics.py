@@ -0,0 +1,38 @@
+"""Diagnostics support for the daelim-smarthome integration."""
+
+from __future__ import annotations
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .decoder import DECODER
+from .helper import http_stats
+
+TO_REDACT = {
+    "email",
+    "username",
+    "password",
+    "device_id",
+    "websocket_keys",
+    "csrf",
+    "daelim_elife",
+    "unique_id",
+    "title",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "devices": len(coordinator.device_states),
+        "dispatch": coordinator.dispatch_stats,
+        "command_latency": coordinator.command_latency.summary(),
+        "http": http_stats.summary(),
+        "websocket": coordinator.websocket_stats.summary() | {"decoder": DECODER},
+    }
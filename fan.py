@@ -34,6 +34,7 @@ async def async_setup_entry(
             entities += [
                 DaelimVent(device_data, coordinator)
                 for device_data in devices["devices"]
+                if device_data["uid"] in coordinator.states
             ]
 
     async_add_entities(entities)
@@ -50,12 +51,12 @@ class DaelimVent(CoordinatorEntity, FanEntity):
         super().__init__(coordinator, context=self.uid)
         self.coordinator = coordinator
 
-        operation = device_data["operation"]
+        state = coordinator.states[self.uid]
         self._attr_name = "{} Ventilation".format(get_location(device_data))
         self._group = get_location(device_data)
-        self._type = operation["type"]
-        self._state = operation["status"] == "on"
-        self._mode = operation.get("mode")
+        self._type = device_data["operation"]["type"]
+        self._state = state.is_on
+        self._mode = state.mode
 
         self._attr_supported_features = (
             FanEntityFeature.PRESET_MODE
@@ -88,46 +89,42 @@ class DaelimVent(CoordinatorEntity, FanEntity):
             manufacturer="Daelim Smarthome",
         )
 
-    def _control(self, operation: dict) -> bool:
-        body = {"type": self._type, "uid": self.uid, "operation": operation}
-        response = self.coordinator.request_ajax("/device/control.ajax", body)
-        return bool(response["result"])
+    async def _async_control(self, operation: dict, expected: dict) -> None:
+        await self.coordinator.async_control(
+            self.uid, self._type, operation, expected=expected
+        )
 
-    def turn_on(
+    async def async_turn_on(
         self,
         percentage: int | None = None,
         preset_mode: str | None = None,
         **kwargs: Any,
     ) -> None:
         """Turn the fan on, optionally in a given mode."""
-        if self._control({"control": "on", "off_rsv_time": "0"}):
-            self._state = True
+        await self._async_control(
+            {"control": "on", "off_rsv_time": "0"}, {"status": "on"}
+        )
         if preset_mode is not None:
-            self.set_preset_mode(preset_mode)
-        else:
-            self.schedule_update_ha_state()
+            await self.async_set_preset_mode(preset_mode)
 
-    def turn_off(self, **kwargs: Any) -> None:
+    async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the fan off."""
-        if self._control({"control": "off", "off_rsv_time": "0"}):
-            self._state = False
-        self.schedule_update_ha_state()
+        await self._async_control(
+            {"control": "off", "off_rsv_time": "0"}, {"status": "off"}
+        )
 
-    def set_preset_mode(self, preset_mode: str) -> None:
+    async def async_set_preset_mode(self, preset_mode: str) -> None:
         """Set the ventilation mode."""
-        if self._control({"mode": preset_mode}):
-            self._mode = preset_mode
-            self._state = True
-        self.schedule_update_ha_state()
+        await self._async_control(
+            {"mode": preset_mode}, {"mode": preset_mode, "status": "on"}
+        )
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        data = self.coordinator.data
-        if self.uid in data:
-            operation = data[self.uid]
-            self._state = operation.get("status") == "on"
-            mode = operation.get("mode")
-            if mode:
-                self._mode = mode
+        state = self.coordinator.states.get(self.uid)
+        if state is not None:
+            self._state = state.is_on
+            if state.mode:
+                self._mode = state.mode
             self.async_write_ha_state()
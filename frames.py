@@ -0,0 +1,79 @@
+"""Websocket frame recording for the daelim-smarthome integration."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import time
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+_LOGGER = logging.getLogger(__name__)
+
+# Recorded frames are buffered and appended to the file this often.
+FLUSH_INTERVAL = timedelta(seconds=5)
+
+REDACTED = "**REDACTED**"
+
+# The recording, in the Home Assistant config directory.
+FRAMES_FILE = "daelim_smarthome.frames.jsonl.gz"
+
+
+class FrameRecorder:
+    """Appends delivered websocket frames to a gzipped JSON-lines file.
+
+    Every line is `[unix time, frame text]`, with the session's secrets
+    (websocket keys, token) replaced by REDACTED. Each flush appends a new
+    gzip member, so the file only ever grows and an interrupted write
+    loses at most the last flush. Writes happen in the executor, so the
+    push path never waits on the disk.
+    """
+
+    def __init__(self, hass: HomeAssistant, path) -> None:
+        self._hass = hass
+        self.path = path
+        self._buffer: list[str] = []
+        self._unsub_flush = None
+
+    @callback
+    def record(self, raw_message, secrets) -> None:
+        if isinstance(raw_message, bytes):
+            raw_message = raw_message.decode("utf-8", "replace")
+        for secret in secrets:
+            if secret:
+                raw_message = raw_message.replace(secret, REDACTED)
+        self._buffer.append(
+            json.dumps([round(time.time(), 3), raw_message], ensure_ascii=False)
+        )
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self._hass, FLUSH_INTERVAL, self._async_flush
+            )
+
+    async def _async_flush(self, _now=None) -> None:
+        self._unsub_flush = None
+        lines, self._buffer = self._buffer, []
+        if lines:
+            await self._hass.async_add_executor_job(self._write, lines)
+
+    def _write(self, lines) -> None:
+        with gzip.open(self.path, "at", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+    async def async_close(self, _event=None) -> None:
+        """Write out what is still buffered."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+        await self._async_flush()
+
+
+def read_frames(path):
+    """Yield the (unix time, frame text) pairs of a recording."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                timestamp, raw_message = json.loads(line)
+                yield timestamp, raw_message
@@ -36,6 +36,7 @@ async def async_setup_entry(
             entities = [
                 DaelimLight(device_data, coordinator)
                 for device_data in devices["devices"]
+                if device_data["uid"] in coordinator.states
             ]
 
     async_add_entities(entities)
@@ -54,7 +55,7 @@ class DaelimLight(CoordinatorEntity, LightEntity):
         self._attr_name = "{} Light {}".format(  # noqa: UP032
             get_location(device_data), self.device_name[-1]
         )
-        self._state = device_data["operation"]["status"] == "on"
+        self._state = coordinator.states[self.uid].is_on
         self._group = get_location(device_data)
         self._type = device_data["operation"]["type"]
         self._attr_supported_color_modes = {ColorMode.ONOFF}
@@ -79,25 +80,19 @@ class DaelimLight(CoordinatorEntity, LightEntity):
             manufacturer="Daelim Smarthome",
         )
 
-    def turn_on(self, **kwargs: Any) -> None:
+    async def async_turn_on(self, **kwargs: Any) -> None:
         """Instruct the light to turn on."""
         body = {"type": self._type, "uid": self.uid, "control": "on"}
-        response = self.coordinator.request_ajax("/device/control/all.ajax", body)
-        if response["result"]:
-            self._state = True
-        self.schedule_update_ha_state()
+        await self.coordinator.async_control_all(body, expected={"status": "on"})
 
-    def turn_off(self, **kwargs: Any) -> None:
+    async def async_turn_off(self, **kwargs: Any) -> None:
         """Instruct the light to turn off."""
         body = {"type": self._type, "uid": self.uid, "control": "off"}
-        response = self.coordinator.request_ajax("/device/control/all.ajax", body)
-        if response["result"]:
-            self._state = False
-        self.schedule_update_ha_state()
+        await self.coordinator.async_control_all(body, expected={"status": "off"})
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        data = self.coordinator.data
-        if self.uid in data:
-            self._state = data[self.uid]["status"] == "on"
+        state = self.coordinator.states.get(self.uid)
+        if state is not None:
+            self._state = state.is_on
             self.async_write_ha_state()
@@ -0,0 +1,211 @@
+"""Runtime metrics for the daelim-smarthome integration."""
+
+from __future__ import annotations
+
+import bisect
+import math
+import time
+from collections import deque
+
+# Percentiles are taken over this many of the most recent samples per key.
+LATENCY_SAMPLES = 200
+
+# Upper bounds, in seconds, of the HTTP latency histogram buckets. The
+# last bucket takes everything slower.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class LatencyStats:
+    """Recent latency samples per key, summarized as percentiles."""
+
+    def __init__(self, samples=LATENCY_SAMPLES) -> None:
+        self._maxlen = samples
+        self._samples: dict[str, deque] = {}
+
+    def record(self, key, seconds) -> None:
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self._maxlen)
+        samples.append(seconds)
+
+    def percentile(self, key, percent) -> float | None:
+        """Nearest-rank percentile in milliseconds, None without samples."""
+        samples = self._samples.get(key)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+        return round(ordered[rank - 1] * 1000, 1)
+
+    def summary(self) -> dict:
+        return {
+            key: {
+                "samples": len(samples),
+                "p50_ms": self.percentile(key, 50),
+                "p95_ms": self.percentile(key, 95),
+                "p99_ms": self.percentile(key, 99),
+            }
+            for key, samples in self._samples.items()
+        }
+
+
+class EndpointStats:
+    """Counters and a latency histogram for one HTTP endpoint."""
+
+    COUNTERS = (
+        "requests",
+        "errors",
+        "fast_timeout_retries",
+        "pool_resets",
+        "server_error_retries",
+        "logged_out_recoveries",
+    )
+
+    __slots__ = (*COUNTERS, "latency_sum", "buckets")
+
+    def __init__(self) -> None:
+        for counter in self.COUNTERS:
+            setattr(self, counter, 0)
+        self.latency_sum = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, seconds) -> None:
+        """Record the latency of a request that got an answer."""
+        self.latency_sum += seconds
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def as_dict(self) -> dict:
+        answered = sum(self.buckets)
+        bounds = [f"le_{bound}s" for bound in LATENCY_BUCKETS] + ["inf"]
+        return {counter: getattr(self, counter) for counter in self.COUNTERS} | {
+            "mean_latency_ms": (
+                round(self.latency_sum / answered * 1000, 1) if answered else None
+            ),
+            "latency_histogram": dict(zip(bounds, self.buckets)),
+        }
+
+
+class HttpStats:
+    """EndpointStats of every path requested from the Daelim API."""
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, EndpointStats] = {}
+
+    def endpoint(self, path) -> EndpointStats:
+        path = path.partition("?")[0]
+        stats = self.endpoints.get(path)
+        if stats is None:
+            stats = self.endpoints[path] = EndpointStats()
+        return stats
+
+    def total(self, counter) -> int:
+        return sum(getattr(stats, counter) for stats in self.endpoints.values())
+
+    def mean_latency(self) -> float | None:
+        """Mean latency of all answered requests in milliseconds."""
+        answered = sum(sum(stats.buckets) for stats in self.endpoints.values())
+        if not answered:
+            return None
+        total = sum(stats.latency_sum for stats in self.endpoints.values())
+        return round(total / answered * 1000, 1)
+
+    def summary(self) -> dict:
+        return {path: stats.as_dict() for path, stats in self.endpoints.items()}
+
+
+class WebsocketStats:
+    """Throughput and reconnects of the push connection."""
+
+    # why a connection ended: recycled at MAX_CONNECTION_AGE, closed by
+    # the server or network, keys rejected, keepalive ping unanswered, no
+    # frames for the silence timeout and no pong, or any other error
+    REASONS = (
+        "max_age",
+        "connection_closed",
+        "token_expired",
+        "ping_timeout",
+        "silent",
+        "error",
+    )
+
+    # messages/sec is averaged over this many seconds
+    RATE_WINDOW = 60
+
+    def __init__(self) -> None:
+        self.messages = 0
+        self.bytes = 0
+        self.connects = 0
+        # device state resyncs run after a reconnect
+        self.resyncs = 0
+        self.reconnects = dict.fromkeys(self.REASONS, 0)
+        # seconds the task is sleeping before the next attempt, 0 if not
+        self.backoff = 0
+        self.last_message_at = None
+        self.connected_at = None
+        # round trip of the last keepalive ping, in seconds
+        self.ping_latency = None
+        self._recent = deque()
+
+    def connected(self) -> None:
+        self.connects += 1
+        self.backoff = 0
+        self.connected_at = time.monotonic()
+
+    def disconnected(self, reason, backoff=0) -> None:
+        self.reconnects[reason] += 1
+        self.backoff = backoff
+        self.connected_at = None
+
+    def received(self, size) -> None:
+        now = time.monotonic()
+        self.messages += 1
+        self.bytes += size
+        self.last_message_at = now
+        self._recent.append(now)
+        self._prune(now)
+
+    def _prune(self, now) -> None:
+        recent = self._recent
+        while recent and recent[0] < now - self.RATE_WINDOW:
+            recent.popleft()
+
+    def messages_per_second(self) -> float:
+        self._prune(time.monotonic())
+        return round(len(self._recent) / self.RATE_WINDOW, 3)
+
+    def seconds_since_last_message(self) -> float | None:
+        if self.last_message_at is None:
+            return None
+        return round(time.monotonic() - self.last_message_at, 1)
+
+    def seconds_silent(self) -> float:
+        """Seconds since the current connection last delivered a frame."""
+        if self.connected_at is None:
+            return 0.0
+        last = self.connected_at
+        if self.last_message_at is not None:
+            last = max(last, self.last_message_at)
+        return time.monotonic() - last
+
+    def summary(self) -> dict:
+        return {
+            "connected": self.connected_at is not None,
+            "connected_for_s": (
+                round(time.monotonic() - self.connected_at, 1)
+                if self.connected_at is not None
+                else None
+            ),
+            "connects": self.connects,
+            "reconnects": dict(self.reconnects),
+            "backoff_s": self.backoff,
+            "ping_latency_ms": (
+                round(self.ping_latency * 1000, 1)
+                if self.ping_latency is not None
+                else None
+            ),
+            "messages": self.messages,
+            "bytes": self.bytes,
+            "resyncs": self.resyncs,
+            "messages_per_second": self.messages_per_second(),
+            "seconds_since_last_message": self.seconds_since_last_message(),
+        }
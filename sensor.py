@@ -0,0 +1,236 @@
+"""Platform for sensor integration."""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .helper import http_stats
+from .metrics import EndpointStats, WebsocketStats
+
+_LOGGER = logging.getLogger(__name__)
+SCAN_INTERVAL = timedelta(seconds=30)
+
+# (key, name, device class, state class, unit, value from WebsocketStats)
+WEBSOCKET_SENSORS = [
+    (
+        "messages_per_second",
+        "Websocket messages per second",
+        None,
+        SensorStateClass.MEASUREMENT,
+        "messages/s",
+        lambda stats: stats.messages_per_second(),
+    ),
+    (
+        "bytes",
+        "Websocket data received",
+        SensorDeviceClass.DATA_SIZE,
+        SensorStateClass.TOTAL_INCREASING,
+        UnitOfInformation.BYTES,
+        lambda stats: stats.bytes,
+    ),
+    (
+        "backoff",
+        "Websocket reconnect backoff",
+        SensorDeviceClass.DURATION,
+        SensorStateClass.MEASUREMENT,
+        UnitOfTime.SECONDS,
+        lambda stats: stats.backoff,
+    ),
+    (
+        "ping_latency",
+        "Websocket ping latency",
+        SensorDeviceClass.DURATION,
+        SensorStateClass.MEASUREMENT,
+        UnitOfTime.MILLISECONDS,
+        lambda stats: (
+            round(stats.ping_latency * 1000, 1)
+            if stats.ping_latency is not None
+            else None
+        ),
+    ),
+    (
+        "since_last_message",
+        "Websocket time since last message",
+        SensorDeviceClass.DURATION,
+        SensorStateClass.MEASUREMENT,
+        UnitOfTime.SECONDS,
+        lambda stats: stats.seconds_since_last_message(),
+    ),
+]
+
+# device_list groups the integration sends commands to
+CONTROLLED_TYPES = ["light", "heat", "aircon", "vent", "wallsocket", "alloffswitch"]
+PERCENTILES = [50, 95, 99]
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Setup sensors"""
+    coordinator = hass.data[DOMAIN]
+    present = {devices["type"] for devices in coordinator.device_list}
+    entities = [
+        DaelimCommandLatencySensor(coordinator, config_entry, device_type, percent)
+        for device_type in CONTROLLED_TYPES
+        if device_type in present
+        for percent in PERCENTILES
+    ]
+    entities += [
+        DaelimHttpCounterSensor(config_entry, counter)
+        for counter in EndpointStats.COUNTERS
+    ]
+    entities.append(DaelimHttpLatencySensor(config_entry))
+    entities += [
+        DaelimWebsocketSensor(coordinator, config_entry, description)
+        for description in WEBSOCKET_SENSORS
+    ]
+    entities += [
+        DaelimWebsocketReconnectSensor(coordinator, config_entry, reason)
+        for reason in WebsocketStats.REASONS
+    ]
+    async_add_entities(entities)
+
+
+def cloud_device_info(config_entry: ConfigEntry) -> DeviceInfo:
+    """The service device the integration's diagnostic sensors belong to."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, config_entry.entry_id)},
+        name="Daelim Cloud",
+        manufacturer="Daelim Smarthome",
+        entry_type=DeviceEntryType.SERVICE,
+    )
+
+
+class DaelimCommandLatencySensor(SensorEntity):
+    """A percentile of the command-to-push latency of one device type.
+
+    Measured from the control request going out to the websocket push
+    confirming it, over the most recent commands. Disabled by default.
+    """
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, config_entry, device_type, percent) -> None:
+        """Initialize a DaelimCommandLatencySensor."""
+        self.coordinator = coordinator
+        self._device_type = device_type
+        self._percent = percent
+        self._attr_name = f"{device_type} command latency p{percent}"
+        self._attr_unique_id = (
+            f"{config_entry.entry_id}_{device_type}_command_latency_p{percent}"
+        )
+        self._attr_device_info = cloud_device_info(config_entry)
+
+    @property
+    def native_value(self) -> float | None:
+        return self.coordinator.command_latency.percentile(
+            self._device_type, self._percent
+        )
+
+
+class DaelimHttpCounterSensor(SensorEntity):
+    """A counter of the HTTP transport, summed over all endpoints.
+
+    Counts since Home Assistant started; the per-endpoint breakdown is in
+    the diagnostics download.
+    """
+
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, config_entry, counter) -> None:
+        """Initialize a DaelimHttpCounterSensor."""
+        self._counter = counter
+        self._attr_name = "HTTP {}".format(counter.replace("_", " "))
+        self._attr_unique_id = f"{config_entry.entry_id}_http_{counter}"
+        self._attr_device_info = cloud_device_info(config_entry)
+
+    @property
+    def native_value(self) -> int:
+        return http_stats.total(self._counter)
+
+
+class DaelimHttpLatencySensor(SensorEntity):
+    """Mean latency of the answered HTTP requests, retries included."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_name = "HTTP mean latency"
+
+    def __init__(self, config_entry) -> None:
+        """Initialize a DaelimHttpLatencySensor."""
+        self._attr_unique_id = f"{config_entry.entry_id}_http_mean_latency"
+        self._attr_device_info = cloud_device_info(config_entry)
+
+    @property
+    def native_value(self) -> float | None:
+        return http_stats.mean_latency()
+
+
+class DaelimWebsocketSensor(SensorEntity):
+    """A health or throughput figure of the push connection."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, config_entry, description) -> None:
+        """Initialize a DaelimWebsocketSensor."""
+        self.coordinator = coordinator
+        (
+            key,
+            self._attr_name,
+            self._attr_device_class,
+            self._attr_state_class,
+            self._attr_native_unit_of_measurement,
+            self._value,
+        ) = description
+        self._attr_unique_id = f"{config_entry.entry_id}_websocket_{key}"
+        self._attr_device_info = cloud_device_info(config_entry)
+
+    @property
+    def native_value(self):
+        return self._value(self.coordinator.websocket_stats)
+
+
+class DaelimWebsocketReconnectSensor(SensorEntity):
+    """How often the push connection ended for one reason."""
+
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, config_entry, reason) -> None:
+        """Initialize a DaelimWebsocketReconnectSensor."""
+        self.coordinator = coordinator
+        self._reason = reason
+        self._attr_name = "Websocket reconnects ({})".format(reason.replace("_", " "))
+        self._attr_unique_id = f"{config_entry.entry_id}_websocket_reconnects_{reason}"
+        self._attr_device_info = cloud_device_info(config_entry)
+
+    @property
+    def native_value(self) -> int:
+        return self.coordinator.websocket_stats.reconnects[self._reason]
@@ -0,0 +1,155 @@
+"""Typed device states for the daelim-smarthome integration.
+
+The cloud reports a device as an `operation` of strings ("on", "24",
+"255", ...). The coordinator parses every full operation it stores into
+one of the state classes below, once per change, and entities read the
+parsed fields instead of re-parsing the strings on every update. An
+operation that doesn't parse is rejected there, before it reaches the
+store or any entity.
+"""
+
+from __future__ import annotations
+
+# Air conditioner operating modes as the cloud spells them.
+AIRCON_MODES = ("cool", "dehumi", "auto", "fan")
+
+# Temperature readings an air conditioner reports when it has none.
+NO_TEMPERATURE = (-1, 255)
+
+
+class InvalidState(ValueError):
+    """An operation that does not describe a valid device state."""
+
+
+class DeviceState:
+    """Parsed state of one device; subclasses list their fields as slots."""
+
+    __slots__ = ()
+    # the slots of the class and all its bases
+    _fields: tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._fields = cls._fields + tuple(cls.__dict__.get("__slots__", ()))
+
+    def __eq__(self, other) -> bool:
+        return type(other) is type(self) and all(
+            getattr(self, name) == getattr(other, name) for name in self._fields
+        )
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+
+class Switch(DeviceState):
+    """An on/off device."""
+
+    __slots__ = ("is_on",)
+
+    def __init__(self, operation) -> None:
+        self.is_on = operation["status"] == "on"
+
+
+class Light(Switch):
+    __slots__ = ()
+
+
+class WallSocket(Switch):
+    __slots__ = ()
+
+
+class AllOffSwitch(Switch):
+    __slots__ = ()
+
+
+class Heat(DeviceState):
+    """A floor heating zone."""
+
+    __slots__ = ("is_on", "away", "current_temp", "set_temp")
+
+    def __init__(self, operation) -> None:
+        self.is_on = operation["control"] == "on"
+        self.away = operation["mode"] == "out"
+        self.current_temp = int(operation["current_temp"])
+        self.set_temp = int(operation["set_temp"])
+
+
+def _temperature(value) -> int | None:
+    value = int(value)
+    return None if value in NO_TEMPERATURE else value
+
+
+class Aircon(DeviceState):
+    """An air conditioner; mode is one of AIRCON_MODES while it runs."""
+
+    __slots__ = ("is_on", "mode", "wind_speed", "current_temp", "set_temp")
+
+    def __init__(self, operation) -> None:
+        self.is_on = operation["status"] != "off"
+        self.mode = operation["mode"]
+        if self.is_on and self.mode not in AIRCON_MODES:
+            raise InvalidState(f"unknown aircon mode {self.mode!r}")
+        self.wind_speed = operation["wind_speed"] or None
+        self.current_temp = _temperature(operation["current_temp"])
+        self.set_temp = _temperature(operation["set_temp"])
+
+
+class Vent(DeviceState):
+    """A ventilation unit; mode is None when the operation has none."""
+
+    __slots__ = ("is_on", "mode")
+
+    def __init__(self, operation) -> None:
+        self.is_on = operation.get("status") == "on"
+        self.mode = operation.get("mode") or None
+
+
+class Gas(DeviceState):
+    """A gas valve."""
+
+    __slots__ = ("is_open",)
+
+    def __init__(self, operation) -> None:
+        self.is_open = operation["status"] == "open"
+
+
+class Smartdoor(DeviceState):
+    """The front door lock."""
+
+    __slots__ = ("is_open", "battery")
+
+    def __init__(self, operation) -> None:
+        self.is_open = operation["status"] == "open"
+        self.battery = int(operation["battery"])
+
+
+# The state class of each device_list group that has one.
+STATE_TYPES: dict[str, type[DeviceState]] = {
+    "light": Light,
+    "wallsocket": WallSocket,
+    "alloffswitch": AllOffSwitch,
+    "heat": Heat,
+    "aircon": Aircon,
+    "vent": Vent,
+    "gas": Gas,
+    "smartdoor": Smartdoor,
+}
+
+
+def parse_state(device_type, operation) -> DeviceState | None:
+    """Parse a full operation, None for device types without a state class.
+
+    Raises InvalidState when the operation is malformed.
+    """
+    state_type = STATE_TYPES.get(device_type)
+    if state_type is None:
+        return None
+    try:
+        return state_type(operation)
+    except InvalidState:
+        raise
+    except (KeyError, TypeError, ValueError, AttributeError) as err:
+        raise InvalidState(
+            f"{device_type} operation {operation!r}: {type(err).__name__} {err}"
+        ) from err
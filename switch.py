@@ -40,11 +40,13 @@ async def async_setup_entry(
             entities += [
                 DaelimAllOffSwitch(device_data, coordinator)
                 for device_data in devices["devices"]
+                if device_data["uid"] in coordinator.states
             ]
         elif devices["type"] == "wallsocket":
             entities += [
                 DaelimWallSocket(device_data, coordinator)
                 for device_data in devices["devices"]
+                if device_data["uid"] in coordinator.states
             ]
 
     async_add_entities(entities)
@@ -62,7 +64,7 @@ class DaelimSwitch(CoordinatorEntity, SwitchEntity):
         super().__init__(coordinator, context=self.uid)
         self.coordinator = coordinator
 
-        self._state = device_data["operation"]["status"] == "on"
+        self._state = coordinator.states[self.uid].is_on
         self._group = get_location(device_data)
         self._type = device_data["operation"]["type"]
 
@@ -85,32 +87,28 @@ class DaelimSwitch(CoordinatorEntity, SwitchEntity):
             manufacturer="Daelim Smarthome",
         )
 
-    def _control(self, control: str) -> None:
+    async def _async_control(self, control: str) -> None:
         body = {
             "type": self._type,
             "uid": self.uid,
             "control": control,
             "is_control_all": "N",
         }
-        self.coordinator.request_ajax("/device/control/all.ajax", body)
+        await self.coordinator.async_control_all(body, expected={"status": control})
 
-    def turn_on(self, **kwargs: Any) -> None:
+    async def async_turn_on(self, **kwargs: Any) -> None:
         """Instruct the switch to turn on."""
-        self._control("on")
-        self._state = True
-        self.schedule_update_ha_state()
+        await self._async_control("on")
 
-    def turn_off(self, **kwargs: Any) -> None:
+    async def async_turn_off(self, **kwargs: Any) -> None:
         """Instruct the switch to turn off."""
-        self._control("off")
-        self._state = False
-        self.schedule_update_ha_state()
+        await self._async_control("off")
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        data = self.coordinator.data
-        if self.uid in data:
-            self._state = data[self.uid]["status"] == "on"
+        state = self.coordinator.states.get(self.uid)
+        if state is not None:
+            self._state = state.is_on
             self.async_write_ha_state()
 
 
@@ -0,0 +1,24 @@
+"""Import the integration's modules straight from this checkout.
+
+The repository root is the integration package itself (HACS
+content_in_root), so the tools register it under its domain name and
+import submodules from it without running __init__.py, which needs a
+Home Assistant instance.
+"""
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = "daelim_smarthome"
+
+
+def load(module):
+    """Import and return `daelim_smarthome.<module>` from the checkout."""
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [str(ROOT)]
+        sys.modules[PACKAGE] = package
+    return importlib.import_module(f"{PACKAGE}.{module}")
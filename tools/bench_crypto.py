@@ -0,0 +1,105 @@
+"""Microbenchmark the AES helpers and the bearer token.
+
+    python tools/bench_crypto.py [--repeat N]
+
+Measures encrypt, decrypt, pad and unpad next to the per-call
+AES.new(MODE_CBC) versions they replaced, and the bearer token with and
+without its per-second memo. Prints one JSON object per measurement.
+"""
+
+import argparse
+import base64
+import datetime
+import json
+import sys
+import timeit
+from pathlib import Path
+
+from Crypto.Cipher import AES
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _loader import load  # noqa: E402
+
+helper = load("helper")
+const = load("const")
+
+# a daelim_elife-sized JWT
+TOKEN = "eyJhbGciOiJIUzI1NiJ9.eyJleHAiOjE3MDAwMDAwMDAsInN1YiI6ImJlbmNoIn0." + "s" * 43
+
+
+def legacy_pad(s):
+    n = const.BS - len(s) % const.BS
+    return s + (n * chr(n)).encode("utf-8")
+
+
+def legacy_unpad(s):
+    return s[: -ord(s[len(s) - 1 :])]
+
+
+def legacy_encrypt(raw):
+    cipher = AES.new(const.KEY, AES.MODE_CBC, const.IV)
+    return base64.b64encode(cipher.encrypt(legacy_pad(raw.encode("utf-8")))).decode()
+
+
+def legacy_decrypt(enc):
+    cipher = AES.new(const.KEY, AES.MODE_CBC, const.IV)
+    return legacy_unpad(cipher.decrypt(base64.b64decode(enc)))
+
+
+def legacy_bearer():
+    now_in_kst = datetime.datetime.now() + datetime.timedelta(hours=9)
+    return legacy_encrypt(
+        "{}::{}".format(TOKEN, now_in_kst.strftime("%Y%m%d%H%M%S"))
+    )
+
+
+def report(name, impl, func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat, number)) / number
+    print(
+        json.dumps(
+            {
+                "bench": "crypto",
+                "function": name,
+                "impl": impl,
+                "seconds_per_call": best,
+                "calls_per_second": 1 / best,
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    plain = f"{TOKEN}::20240101000000"
+    padded = helper.pad(plain.encode())
+    enc = helper.encrypt(plain)
+    assert enc == legacy_encrypt(plain)
+    assert helper.decrypt(enc) == legacy_decrypt(enc) == plain.encode()
+    assert padded == legacy_pad(plain.encode())
+
+    credentials = helper.Credentials("bench", "bench")
+    credentials.daelim_elife = TOKEN
+
+    cases = [
+        ("encrypt", "legacy", lambda: legacy_encrypt(plain)),
+        ("encrypt", "helper", lambda: helper.encrypt(plain)),
+        ("decrypt", "legacy", lambda: legacy_decrypt(enc)),
+        ("decrypt", "helper", lambda: helper.decrypt(enc)),
+        ("pad", "legacy", lambda: legacy_pad(plain.encode())),
+        ("pad", "helper", lambda: helper.pad(plain.encode())),
+        ("unpad", "legacy", lambda: legacy_unpad(padded)),
+        ("unpad", "helper", lambda: helper.unpad(padded)),
+        ("bearer_token", "legacy", legacy_bearer),
+        ("bearer_token", "helper", credentials._bearer_token),
+    ]
+    for name, impl, func in cases:
+        report(name, impl, func, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
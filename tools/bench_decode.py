@@ -0,0 +1,121 @@
+"""Microbenchmark websocket frame decoding.
+
+    python tools/bench_decode.py [FRAMES ...] [--frames N] [--repeat N]
+
+Decodes a corpus of push frames with every decoder decoder.py can use
+here (msgspec, orjson, json) next to the json.loads() and dict walk they
+replaced, and checks they all extract the same (uid, operation) pairs.
+The corpus is the given record_frames recordings (see frames.py), or
+--frames synthetic frames shaped like the fake cloud's pushes. Prints one
+JSON object per decoder.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import fake_cloud  # noqa: E402
+from _loader import load  # noqa: E402
+
+decoder = load("decoder")
+const = load("const")
+
+
+def legacy_decode(raw_message):
+    message = json.loads(raw_message)
+    normal = (
+        "result" in message
+        and message["result"]["message"] == const.MESSAGE_WEBSOCKET_STATUS_NORMAL
+    ) or "action" in message
+    devices = None
+    if "data" in message:
+        devices = [
+            (device["uid"], device.get("operation", {}))
+            for device in message["data"].get("devices", [])
+        ]
+    return normal, devices
+
+
+def read_recordings(paths):
+    """The frame texts of record_frames recordings."""
+    frames = []
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            frames.extend(json.loads(line)[1] for line in file if line.strip())
+    return frames
+
+
+def synthetic_frames(count):
+    """A status frame, then pushes of one to three full device states."""
+    devices = [
+        {"uid": device["uid"], "operation": device["operation"]}
+        for group in fake_cloud.build_home(20, 8, 4, 1, 10)
+        for device in group["devices"]
+    ]
+    rng = random.Random(0)
+    status = {"status": True, "message": const.MESSAGE_WEBSOCKET_STATUS_NORMAL}
+    frames = [json.dumps({"result": status}, ensure_ascii=False)]
+    while len(frames) < count:
+        pushed = rng.sample(devices, rng.randint(1, 3))
+        frames.append(
+            json.dumps(
+                {"action": "event", "data": {"devices": pushed}}, ensure_ascii=False
+            )
+        )
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recordings", nargs="*", type=Path)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = (
+        read_recordings(args.recordings)
+        if args.recordings
+        else synthetic_frames(args.frames)
+    )
+    if not frames:
+        raise SystemExit("no frames recorded")
+    size = sum(len(raw_message.encode()) for raw_message in frames)
+
+    decoders = [("legacy", legacy_decode)]
+    for name in ("msgspec", "orjson", "json"):
+        decode = getattr(decoder, f"decode_with_{name}")
+        if decode is not None:
+            decoders.append((name, decode))
+
+    expected = [legacy_decode(raw_message) for raw_message in frames]
+    for name, decode in decoders[1:]:
+        decoded = [decode(raw_message) for raw_message in frames]
+        assert [(f.normal, f.devices) for f in decoded] == expected, name
+
+    for name, decode in decoders:
+        timer = timeit.Timer(lambda: [decode(raw_message) for raw_message in frames])
+        best = min(timer.repeat(args.repeat, 1))
+        print(
+            json.dumps(
+                {
+                    "bench": "decode",
+                    "impl": name,
+                    "default": name == decoder.DECODER,
+                    "frames": len(frames),
+                    "frame_bytes_mean": size / len(frames),
+                    "us_per_frame": best / len(frames) * 1e6,
+                    "frames_per_second": len(frames) / best,
+                    "mb_per_second": size / best / 1e6,
+                }
+            ),
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Benchmark the integration end to end against the fake Daelim cloud.
+
+    python tools/bench_e2e.py [--devices N [N ...]] [--controls N] [--messages N]
+
+For each home size, a tools/fake_cloud.py server is started and the
+integration is set up in a Home Assistant test instance pointed at it:
+
+- setup_cold_s: first setup, nothing cached (login, home.do, car data)
+- setup_warm_s: setup again from the session and home snapshot the cold
+  setup left behind
+- control_ms: service calls per platform until they return, p50/p95;
+  control.ajax platforms (climate, fan) include the coalescing window
+- command_latency: the coordinator's own command-to-push percentiles
+- push_messages_per_s: frame texts through the coordinator's decoding
+  and handle_push_frame, each changing one device, entity state writes
+  included
+- memory_per_entity_bytes: memory allocated by a warm setup, divided by
+  the number of entities it created
+
+Needs Home Assistant and pytest-homeassistant-custom-component (for the
+test instance). Prints one JSON object per measurement.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import fake_cloud  # noqa: E402
+from _loader import ROOT  # noqa: E402
+
+DOMAIN = "daelim_smarthome"
+
+# Every instance sets up the same entry, so the warm setups find the home
+# snapshot the cold one stored (its Store is keyed by entry_id).
+ENTRY_ID = "bench"
+
+# (service domain, service, data for the n-th call)
+CONTROLS = {
+    "light": lambda n: ("turn_on" if n % 2 == 0 else "turn_off", {}),
+    "switch": lambda n: ("turn_on" if n % 2 == 0 else "turn_off", {}),
+    "climate": lambda n: ("set_temperature", {"temperature": 23 + n % 2}),
+    "fan": lambda n: ("set_preset_mode", {"preset_mode": ["auto", "manual"][n % 2]}),
+}
+
+
+def report(devices, metric, value, **extra):
+    print(
+        json.dumps(
+            {"bench": "e2e", "devices": devices, "metric": metric, "value": value}
+            | extra
+        ),
+        flush=True,
+    )
+
+
+def home_for(devices):
+    """A fake home of about `devices` devices, half of them lights."""
+    lights = max(devices // 2, 1)
+    heat = max(devices // 5, 1)
+    aircon = max(devices // 10, 1)
+    # build_home adds an all-off switch, a gas valve and a door lock
+    wallsocket = max(devices - lights - heat - aircon - 1 - 3, 0)
+    return fake_cloud.build_home(lights, heat, aircon, 1, wallsocket)
+
+
+def install(config_dir):
+    """Expose the checkout as a custom component of config_dir."""
+    custom_components = Path(config_dir) / "custom_components"
+    custom_components.mkdir()
+    (custom_components / DOMAIN).symlink_to(ROOT, target_is_directory=True)
+    sys.path.insert(0, str(config_dir))
+
+
+def point_at(cloud, certfile):
+    """Send the integration's HTTP and websocket traffic to the fake."""
+    integration = importlib.import_module(f"custom_components.{DOMAIN}")
+    helper = importlib.import_module(f"custom_components.{DOMAIN}.helper")
+    context = fake_cloud.client_ssl_context(certfile)
+    helper.API_PREFIX = cloud.url
+    helper.get_default_context = integration.get_default_context = lambda: context
+    integration.WEBSOCKET_URL = cloud.ws_url
+    return helper
+
+
+@asynccontextmanager
+async def home_assistant(config_dir):
+    async with async_test_home_assistant(config_dir=str(config_dir)) as hass:
+        # test instances block custom components unless this is dropped
+        # (homeassistant.loader.DATA_CUSTOM_COMPONENTS; importing loader
+        # before homeassistant.core is a circular import)
+        hass.data.pop("custom_components", None)
+        yield hass
+
+
+async def setup(hass, credentials):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id=ENTRY_ID,
+        title="Daelim Home",
+        data={"email": "bench", "password": "bench", "credentials": credentials},
+    )
+    entry.add_to_hass(hass)
+    started = time.perf_counter()
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    elapsed = time.perf_counter() - started
+    await hass.async_block_till_done()
+    return entry, elapsed
+
+
+async def bench_controls(hass, entry, devices, controls):
+    entities = er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)
+    for domain, call in CONTROLS.items():
+        entity_ids = [e.entity_id for e in entities if e.domain == domain]
+        if not entity_ids:
+            continue
+        samples = []
+        for n in range(controls):
+            service, data = call(n)
+            data = data | {"entity_id": entity_ids[n % len(entity_ids)]}
+            started = time.perf_counter()
+            await hass.services.async_call(domain, service, data, blocking=True)
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        report(
+            devices,
+            "control_ms",
+            statistics.median(samples),
+            platform=domain,
+            p95=samples[max(round(len(samples) * 0.95) - 1, 0)],
+            calls=len(samples),
+        )
+    # let the last pushes confirm
+    await asyncio.sleep(1)
+    coordinator = hass.data[DOMAIN]
+    for device_type, summary in coordinator.command_latency.summary().items():
+        report(devices, "command_latency", summary, device_type=device_type)
+
+
+def push_frames(coordinator, count):
+    """Frames each flipping one light or socket from its current state."""
+    states = {
+        uid: coordinator.device_states[uid]["status"]
+        for uid, device_type in coordinator.device_types.items()
+        if device_type in ("light", "wallsocket")
+    }
+    uids = list(states)
+    frames = []
+    for n in range(count):
+        uid = uids[n % len(uids)]
+        states[uid] = "off" if states[uid] == "on" else "on"
+        device = {"uid": uid, "operation": {"status": states[uid]}}
+        frames.append(json.dumps({"action": "event", "data": {"devices": [device]}}))
+    return frames
+
+
+async def bench_pushes(hass, devices, messages):
+    coordinator = hass.data[DOMAIN]
+    frames = push_frames(coordinator, messages)
+    started = time.perf_counter()
+    for raw_message in frames:
+        coordinator.handle_push_frame(coordinator._decode_frame(raw_message))
+    await hass.async_block_till_done()
+    elapsed = time.perf_counter() - started
+    report(devices, "push_messages_per_s", len(frames) / elapsed)
+
+
+async def bench_home(devices, args, certfile, keyfile):
+    cloud = fake_cloud.FakeCloud(
+        home_for(devices), fake_cloud.Faults(latency=args.latency)
+    )
+    await cloud.start(ssl_context=fake_cloud.server_ssl_context(certfile, keyfile))
+    helper = None
+    try:
+        with tempfile.TemporaryDirectory() as config_dir:
+            install(config_dir)
+            helper = point_at(cloud, certfile)
+            cold = helper.Credentials("bench", "bench").to_dict()
+            async with home_assistant(config_dir) as hass:
+                entry, elapsed = await setup(hass, cold)
+                report(devices, "setup_cold_s", elapsed)
+                warm = hass.data[DOMAIN].credentials.to_dict()
+
+            async with home_assistant(config_dir) as hass:
+                entry, elapsed = await setup(hass, warm)
+                report(devices, "setup_warm_s", elapsed)
+                await bench_controls(hass, entry, devices, args.controls)
+                await bench_pushes(hass, devices, args.messages)
+
+            async with home_assistant(config_dir) as hass:
+                tracemalloc.start()
+                before = tracemalloc.get_traced_memory()[0]
+                entry, _ = await setup(hass, warm)
+                allocated = tracemalloc.get_traced_memory()[0] - before
+                tracemalloc.stop()
+                entities = len(hass.states.async_all())
+                report(
+                    devices,
+                    "memory_per_entity_bytes",
+                    allocated / max(entities, 1),
+                    entities=entities,
+                )
+            sys.path.remove(config_dir)
+    finally:
+        await cloud.stop()
+        if helper is not None:
+            await helper.close_http_session()
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as directory:
+        certfile, keyfile = fake_cloud.self_signed_certificate(directory)
+        for devices in args.devices:
+            await bench_home(devices, args, certfile, keyfile)
+            # the next home is another custom_components directory
+            for name in [m for m in sys.modules if m.startswith("custom_components")]:
+                del sys.modules[name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[10, 200])
+    parser.add_argument("--controls", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="fake cloud latency, seconds"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark the home.do scraper against the per-field regex scans it replaced.
+
+    python tools/bench_home_page.py [--devices N] [--repeat N] [home.do ...]
+
+Pass captured /main/home.do pages to measure real fixtures; without any,
+a synthetic page is generated with N devices and the fields spread over
+~1.7 MB of markup, the keys near the end as on the real page. Prints one
+JSON object per fixture and implementation.
+"""
+
+import argparse
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _loader import load  # noqa: E402
+
+helper = load("helper")
+
+ELEVATOR_REGEX = r'"category": "elevator",\s+"type": "call",\s+"command": "control_request"\s+},\s+"data" : {\s+"uid": "([^"]+)"'
+
+
+def legacy_parse(html):
+    """The scans home.do used to get: one uncompiled search per field."""
+    fields = {}
+    for key in ["roomKey", "userKey", "accessToken", "daelim_elife"]:
+        match = re.search(rf"'{key}': '([^']+)'", html)
+        fields[key] = match[1] if match else None
+    match = re.search(r"const _deviceListByType = '([^']+)'", html)
+    fields["device_list"] = json.loads(match[1]) if match else None
+    match = re.search(ELEVATOR_REGEX, html)
+    fields["elevator_uid"] = match[1] if match else None
+    return fields
+
+
+def synthetic_page(devices):
+    device_list = [
+        {
+            "type": "light",
+            "devices": [
+                {
+                    "uid": f"LI{i:06d}",
+                    "device_name": f"light {i}",
+                    "location_name": f"room {i % 12}",
+                    "operation": {"type": "light", "status": "on"},
+                }
+                for i in range(devices)
+            ],
+        }
+    ]
+    filler = '<div class="item"><span>{}</span></div>\n'
+    body = "".join(filler.format(i) for i in range(20000))
+    return (
+        "<html><head><script>\n"
+        f"const _deviceListByType = '{json.dumps(device_list)}';\n"
+        "</script></head><body>\n"
+        f"{body}"
+        "<script>\n"
+        "data: JSON.stringify({\n"
+        '"header": {\n    "category": "elevator",\n    "type": "call",\n'
+        '    "command": "control_request"\n},\n'
+        '"data" : {\n    "uid": "CMF990100",\n'
+        "</script>\n"
+        f"{body}"
+        "<script>var ws = {'roomKey': 'room-key', 'userKey': 'user-key', "
+        "'accessToken': 'access-token', 'daelim_elife': 'a.eyJleHAiOjB9.c'};"
+        "</script></body></html>"
+    )
+
+
+def bench(name, html, repeat):
+    impls = [("legacy", legacy_parse), ("parse_home_html", helper.parse_home_html)]
+    for impl, parse in impls:
+        timer = timeit.Timer(lambda: parse(html))
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat, number)) / number
+        print(
+            json.dumps(
+                {
+                    "bench": "home_page",
+                    "fixture": name,
+                    "bytes": len(html.encode()),
+                    "impl": impl,
+                    "seconds_per_parse": best,
+                }
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", type=Path)
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fixtures = [(str(p), p.read_text(encoding="utf-8")) for p in args.pages] or [
+        (f"synthetic-{args.devices}", synthetic_page(args.devices))
+    ]
+    for name, html in fixtures:
+        page = helper.parse_home_html(html)
+        legacy = legacy_parse(html)
+        assert page.device_list == legacy["device_list"], name
+        assert page.elevator_uid == legacy["elevator_uid"], name
+        assert page.daelim_elife == legacy["daelim_elife"], name
+        bench(name, html, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
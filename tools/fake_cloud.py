@@ -0,0 +1,565 @@
+"""A local stand-in for the Daelim cloud, for offline load and failure tests.
+
+    python tools/fake_cloud.py [--port 8443] [--lights N] [--latency S] ...
+
+Serves the endpoints the integration talks to over HTTPS, and the
+/ws/data push socket over WSS on the same port, for a generated home.
+Controls change the device state and are pushed to every subscribed
+socket, as the real server does.
+
+Failure patterns to measure recovery against:
+
+  --latency/--jitter       delay every HTTP answer
+  --drop-rate              cut that share of HTTP connections unanswered
+  --logged-out-rate        answer that share of authenticated calls with
+                           "logged out", dropping the session
+  --token-lifetime         seconds a daelim_elife token lives
+  --cloud-token-lifetime   seconds the websocket keys of a login live
+  --ws-drop-after/-mode    end every push socket after that long, either
+                           aborted or gone silent like a NAT drop (no
+                           frames, no pongs)
+
+Without --certfile, a throwaway self-signed certificate for localhost is
+made with openssl; clients have to trust it. Once listening, one JSON
+line with the base url, websocket url and certificate is printed.
+
+To point the integration at it, set helper.API_PREFIX to the base url and
+the integration's WEBSOCKET_URL to the websocket url, and have both the
+shared HTTP session and the coordinator's ssl_context trust the
+certificate (see client_ssl_context()).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import datetime
+import json
+import random
+import secrets
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from aiohttp import WSMsgType, web
+from Crypto.Cipher import AES
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _loader import load  # noqa: E402
+
+const = load("const")
+
+# as in __init__.py
+MESSAGE_LOGGED_OUT = "장시간 미사용으로 로그아웃 되었습니다."
+MESSAGE_WEBSOCKET_TOKEN_EXPIRED = "만료된 클라우드토큰 입니다."
+MESSAGE_WEBSOCKET_STATUS_NORMAL = "정상"
+
+ROOMS = ["거실", "안방", "침실1", "침실2", "주방", "서재"]
+
+
+@dataclass
+class Faults:
+    """How badly the fake cloud behaves."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    drop_rate: float = 0.0
+    logged_out_rate: float = 0.0
+    token_lifetime: float = 900.0
+    cloud_token_lifetime: float | None = None
+    ws_drop_after: float | None = None
+    ws_drop_mode: str = "abort"
+    # from a control being accepted to its push going out
+    push_delay: float = 0.05
+    # unsolicited state changes pushed per second, for load
+    push_rate: float = 0.0
+
+
+def build_home(lights=8, heat=4, aircon=2, vent=1, wallsocket=2):
+    """A _deviceListByType-shaped device list for a made-up home."""
+
+    def devices(device_type, count, name, operation):
+        return {
+            "type": device_type,
+            "devices": [
+                {
+                    "uid": f"{device_type[:2].upper()}{i:06d}",
+                    "device_name": f"{name}{i % 9 + 1}",
+                    "location_name": ROOMS[i % len(ROOMS)],
+                    "operation": {"type": device_type} | operation,
+                }
+                for i in range(count)
+            ],
+        }
+
+    temps = {"current_temp": "22", "set_temp": "24"}
+    home = [
+        devices("light", lights, "전등", {"status": "off"}),
+        devices("heat", heat, "난방", {"control": "off", "mode": "heat"} | temps),
+        devices(
+            "aircon",
+            aircon,
+            "에어컨",
+            {"status": "off", "mode": "cool", "wind_speed": "auto"} | temps,
+        ),
+        devices("vent", vent, "환기", {"status": "off", "mode": "manual"}),
+        devices("wallsocket", wallsocket, "대기전력콘센트", {"status": "on"}),
+        devices("alloffswitch", 1, "일괄소등", {"status": "off"}),
+        devices("gas", 1, "가스", {"status": "close"}),
+        devices("smartdoor", 1, "현관", {"status": "close", "battery": "80"}),
+    ]
+    return [group for group in home if group["devices"]]
+
+
+def _pad(raw):
+    n = const.BS - len(raw) % const.BS
+    return raw + bytes([n]) * n
+
+
+def encrypt(text):
+    cipher = AES.new(const.KEY, AES.MODE_CBC, const.IV)
+    return base64.b64encode(cipher.encrypt(_pad(text.encode()))).decode()
+
+
+def decrypt(text):
+    cipher = AES.new(const.KEY, AES.MODE_CBC, const.IV)
+    raw = cipher.decrypt(base64.b64decode(text))
+    return raw[: -raw[-1]].decode()
+
+
+def make_token(lifetime, subject):
+    """A daelim_elife-shaped JWT the integration can read the expiry of."""
+
+    def part(data):
+        return base64.b64encode(json.dumps(data).encode()).decode()
+
+    payload = {"exp": int(time.time() + lifetime), "sub": subject}
+    return f"{part({'alg': 'HS256'})}.{part(payload)}.{secrets.token_hex(16)}"
+
+
+def home_html(device_list, keys, token, elevator_uid):
+    """A /main/home.do page with the fields the integration scrapes."""
+    device_json = json.dumps(device_list, ensure_ascii=False)
+    return (
+        "<html><head><script>\n"
+        f"const _deviceListByType = '{device_json}';\n"
+        "</script></head><body>\n"
+        "<script>\n"
+        "data: JSON.stringify({\n"
+        '"header": {\n    "category": "elevator",\n    "type": "call",\n'
+        '    "command": "control_request"\n},\n'
+        f'"data" : {{\n    "uid": "{elevator_uid}",\n'
+        "</script>\n"
+        f"<script>var ws = {{'roomKey': '{keys['roomKey']}', "
+        f"'userKey': '{keys['userKey']}', "
+        f"'accessToken': '{keys['accessToken']}', 'daelim_elife': '{token}'}};"
+        "</script></body></html>"
+    )
+
+
+LOGIN_HTML = "<html><body><form action='/login.do'></form></body></html>"
+
+
+class FakeCloud:
+    """The fake server: one home, one account, one active session."""
+
+    def __init__(self, device_list=None, faults=None, elevator_uid="CMF990100"):
+        self.faults = faults or Faults()
+        self.device_list = device_list if device_list is not None else build_home()
+        self.elevator_uid = elevator_uid
+        self.states = {
+            device["uid"]: device["operation"]
+            for group in self.device_list
+            for device in group["devices"]
+        }
+        self.types = {
+            device["uid"]: group["type"]
+            for group in self.device_list
+            for device in group["devices"]
+        }
+        self.cars = [
+            {
+                "tag_num": "12가3456",
+                "location_text": "B1",
+                "datetime": "2024-01-01 09:00:00",
+            }
+        ]
+        self.csrf = set()
+        self.username = None
+        # live daelim_elife tokens -> expiry (time.time())
+        self.tokens = {}
+        self.keys = None
+        self.keys_issued_at = 0.0
+        # subscribed push sockets -> the keys they subscribed with
+        self.sockets = {}
+        # sockets that went quiet (--ws-drop-mode silent)
+        self.silent = set()
+        self.counts = {}
+        self.url = None
+        self.ws_url = None
+        self._runner = None
+        self._tasks = set()
+
+    def application(self) -> web.Application:
+        app = web.Application(middlewares=[self._faults_middleware])
+        app.router.add_post("/common/nativeToken.ajax", self._native_token)
+        app.router.add_post("/login.ajax", self._login)
+        app.router.add_get("/main/home.do", self._home)
+        app.router.add_post("/device/control.ajax", self._control)
+        app.router.add_post("/device/control/all.ajax", self._control_all)
+        app.router.add_post("/controls/device/status.ajax", self._status)
+        app.router.add_post("/monitoring/locationList.ajax", self._location_list)
+        app.router.add_post("/common/data.ajax", self._common_data)
+        app.router.add_get("/ws/data", self._websocket)
+        return app
+
+    async def start(self, host="127.0.0.1", port=0, ssl_context=None) -> str:
+        """Start listening; returns the base url."""
+        self._runner = web.AppRunner(self.application(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port, ssl_context=ssl_context)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        secure = ssl_context is not None
+        name = "localhost" if host in ("127.0.0.1", "localhost") else host
+        self.url = f"{'https' if secure else 'http'}://{name}:{port}"
+        self.ws_url = f"{'wss' if secure else 'ws'}://{name}:{port}/ws/data"
+        if self.faults.push_rate:
+            self._spawn(self._background_pushes())
+        return self.url
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        for ws in list(self.sockets):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def _spawn(self, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # -- HTTP -------------------------------------------------------------
+
+    @web.middleware
+    async def _faults_middleware(self, request, handler):
+        self.counts[request.path] = self.counts.get(request.path, 0) + 1
+        if request.path == "/ws/data":
+            return await handler(request)
+        faults = self.faults
+        delay = faults.latency + random.uniform(0, faults.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if faults.drop_rate and random.random() < faults.drop_rate:
+            request.transport.abort()
+            raise web.HTTPServiceUnavailable()
+        return await handler(request)
+
+    def _live(self, token) -> bool:
+        return token is not None and self.tokens.get(token, 0) > time.time()
+
+    def _new_token(self):
+        token = make_token(self.faults.token_lifetime, self.username)
+        self.tokens[token] = time.time() + self.faults.token_lifetime
+        return token
+
+    async def _native_token(self, request):
+        csrf = secrets.token_hex(16)
+        self.csrf.add(csrf)
+        return web.json_response({"result": True, "value": csrf})
+
+    async def _login(self, request):
+        body = await request.json()
+        if request.headers.get("_csrf") not in self.csrf:
+            return web.json_response({"result": False, "message": "bad csrf"})
+        self.username = decrypt(body["input_username"])
+        # one active session per account: a login ends the previous one
+        # and mints new websocket keys
+        self.tokens.clear()
+        self.keys = {
+            "roomKey": secrets.token_hex(8),
+            "userKey": secrets.token_hex(8),
+            "accessToken": secrets.token_hex(16),
+        }
+        self.keys_issued_at = time.time()
+        return web.json_response({"result": True, "daelim_elife": self._new_token()})
+
+    async def _home(self, request):
+        bearer = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        try:
+            token = decrypt(bearer).rsplit("::", 1)[0]
+        except (ValueError, IndexError):
+            token = None
+        if not self._live(token) or self.keys is None:
+            return web.Response(text=LOGIN_HTML, content_type="text/html")
+        token = self._new_token()
+        html = home_html(self.device_list, self.keys, token, self.elevator_uid)
+        return web.Response(text=html, content_type="text/html")
+
+    async def _authenticated(self, request):
+        """The JSON body, or a logged-out response to return instead."""
+        if not self._live(request.headers.get("daelim_elife")) or (
+            self.faults.logged_out_rate
+            and random.random() < self.faults.logged_out_rate
+        ):
+            self.tokens.clear()
+            return None, web.json_response(
+                {"result": {"status": False, "message": MESSAGE_LOGGED_OUT}}
+            )
+        return await request.json(), None
+
+    async def _control(self, request):
+        body, refused = await self._authenticated(request)
+        if refused:
+            return refused
+        return self._apply(body["uid"], dict(body["operation"]))
+
+    async def _control_all(self, request):
+        body, refused = await self._authenticated(request)
+        if refused:
+            return refused
+        return self._apply(body["uid"], {"control": body["control"]})
+
+    def _apply(self, uid, operation):
+        state = self.states.get(uid)
+        if state is None:
+            return web.json_response({"result": False, "message": "unknown uid"})
+        if "control" in operation and self.types[uid] != "heat":
+            operation["status"] = operation.pop("control")
+        operation.pop("off_rsv_time", None)
+        if "set_temp" in operation:
+            operation["set_temp"] = str(int(float(operation["set_temp"])))
+        if self.types[uid] == "vent" and "mode" in operation:
+            operation["status"] = "on"
+        state |= operation
+        self._spawn(self._push_later(uid))
+        return web.json_response({"result": True, "message": "정상"})
+
+    async def _status(self, request):
+        body, refused = await self._authenticated(request)
+        if refused:
+            return refused
+        state = self.states.get(body["uid"])
+        if state is None:
+            return web.json_response({"result": False, "message": "unknown uid"})
+        return web.json_response({"result": True, "data": state})
+
+    async def _location_list(self, request):
+        body, refused = await self._authenticated(request)
+        if refused:
+            return refused
+        # the board API reports its result as a status code, not a bool
+        return web.json_response(
+            {"result": {"status": "000"}, "data": {"list": self.cars}}
+        )
+
+    async def _common_data(self, request):
+        body, refused = await self._authenticated(request)
+        if refused:
+            return refused
+        return web.json_response({"result": True})
+
+    # -- websocket --------------------------------------------------------
+
+    def _keys_live(self, keys) -> bool:
+        lifetime = self.faults.cloud_token_lifetime
+        return (
+            self.keys is not None
+            and keys.get("accessToken") == self.keys["accessToken"]
+            and (lifetime is None or time.time() - self.keys_issued_at < lifetime)
+        )
+
+    async def _websocket(self, request):
+        ws = web.WebSocketResponse(autoping=False)
+        await ws.prepare(request)
+        drop = None
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.PING:
+                    if ws not in self.silent:
+                        await ws.pong(msg.data)
+                elif msg.type == WSMsgType.TEXT and ws not in self.sockets:
+                    keys = json.loads(msg.data)
+                    if not self._keys_live(keys):
+                        await ws.send_json(self._expired_frame())
+                        continue
+                    await ws.send_json(
+                        {
+                            "result": {
+                                "status": True,
+                                "message": MESSAGE_WEBSOCKET_STATUS_NORMAL,
+                            }
+                        }
+                    )
+                    self.sockets[ws] = keys
+                    if self.faults.ws_drop_after is not None:
+                        drop = asyncio.get_running_loop().call_later(
+                            self.faults.ws_drop_after, self._drop, ws, request
+                        )
+        finally:
+            self.sockets.pop(ws, None)
+            self.silent.discard(ws)
+            if drop is not None:
+                drop.cancel()
+        return ws
+
+    def _drop(self, ws, request):
+        if self.faults.ws_drop_mode == "silent":
+            self.silent.add(ws)
+        else:
+            self.sockets.pop(ws, None)
+            request.transport.abort()
+
+    @staticmethod
+    def _expired_frame():
+        return {"result": {"status": False, "message": MESSAGE_WEBSOCKET_TOKEN_EXPIRED}}
+
+    async def _push_later(self, uid):
+        await asyncio.sleep(self.faults.push_delay)
+        await self.push([uid])
+
+    async def push(self, uids):
+        """Push the current state of devices to every live subscriber."""
+        frame = {
+            "action": "event",
+            "data": {
+                "devices": [
+                    {"uid": uid, "operation": dict(self.states[uid])} for uid in uids
+                ]
+            },
+        }
+        for ws, keys in list(self.sockets.items()):
+            if ws in self.silent or ws.closed:
+                continue
+            try:
+                if self._keys_live(keys):
+                    await ws.send_json(frame)
+                else:
+                    await ws.send_json(self._expired_frame())
+                    self.sockets.pop(ws, None)
+            except ConnectionError:
+                self.sockets.pop(ws, None)
+
+    async def _background_pushes(self):
+        """Flip random on/off devices at push_rate per second."""
+        switches = [
+            uid
+            for uid, state in self.states.items()
+            if state.get("status") in ("on", "off")
+        ]
+        while switches:
+            await asyncio.sleep(1 / self.faults.push_rate)
+            uid = random.choice(switches)
+            state = self.states[uid]
+            state["status"] = "off" if state["status"] == "on" else "on"
+            await self.push([uid])
+
+
+def self_signed_certificate(directory) -> tuple[Path, Path]:
+    """Make a throwaway certificate for localhost with openssl."""
+    certfile = Path(directory) / "fake_cloud.crt"
+    keyfile = Path(directory) / "fake_cloud.key"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-days", "2", "-subj", "/CN=localhost",
+            "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+            "-keyout", str(keyfile), "-out", str(certfile),
+        ],
+        check=True,
+        capture_output=True,
+    )  # fmt: skip
+    return certfile, keyfile
+
+
+def server_ssl_context(certfile, keyfile) -> ssl.SSLContext:
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(certfile, keyfile)
+    return context
+
+
+def client_ssl_context(certfile) -> ssl.SSLContext:
+    """A client context trusting the fake cloud's certificate."""
+    return ssl.create_default_context(cafile=str(certfile))
+
+
+async def serve(args):
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop_rate,
+        logged_out_rate=args.logged_out_rate,
+        token_lifetime=args.token_lifetime,
+        cloud_token_lifetime=args.cloud_token_lifetime,
+        ws_drop_after=args.ws_drop_after,
+        ws_drop_mode=args.ws_drop_mode,
+        push_delay=args.push_delay,
+        push_rate=args.push_rate,
+    )
+    device_list = build_home(
+        args.lights, args.heat, args.aircon, args.vent, args.wallsocket
+    )
+    cloud = FakeCloud(device_list, faults)
+    with tempfile.TemporaryDirectory() as directory:
+        if args.certfile:
+            certfile, keyfile = args.certfile, args.keyfile
+        else:
+            certfile, keyfile = self_signed_certificate(directory)
+        await cloud.start(
+            args.host, args.port, server_ssl_context(certfile, keyfile)
+        )
+        print(
+            json.dumps(
+                {
+                    "url": cloud.url,
+                    "ws_url": cloud.ws_url,
+                    "certfile": str(certfile),
+                    "devices": len(cloud.states),
+                    "started": datetime.datetime.now().isoformat(),
+                }
+            ),
+            flush=True,
+        )
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await cloud.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--certfile", type=Path)
+    parser.add_argument("--keyfile", type=Path)
+    parser.add_argument("--lights", type=int, default=8)
+    parser.add_argument("--heat", type=int, default=4)
+    parser.add_argument("--aircon", type=int, default=2)
+    parser.add_argument("--vent", type=int, default=1)
+    parser.add_argument("--wallsocket", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--logged-out-rate", type=float, default=0.0)
+    parser.add_argument("--token-lifetime", type=float, default=900.0)
+    parser.add_argument("--cloud-token-lifetime", type=float)
+    parser.add_argument("--ws-drop-after", type=float)
+    parser.add_argument("--ws-drop-mode", choices=["abort", "silent"], default="abort")
+    parser.add_argument("--push-delay", type=float, default=0.05)
+    parser.add_argument("--push-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Replay recorded websocket frames through the integration's push path.
+
+    python tools/replay_frames.py FRAMES [FRAMES ...] [--speed X] [--repeat N]
+
+FRAMES are recordings made with the record_frames option (see frames.py).
+A fake cloud is started with a home made up of the devices the frames
+mention, the integration is set up against it as in bench_e2e.py, and
+every frame is fed through the coordinator's frame decoding and
+handle_push_frame(), entity updates included. --speed 1 keeps the
+recorded pacing, 0 (the default) goes as fast as possible. Prints one
+JSON object per pass.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import fake_cloud  # noqa: E402
+from bench_e2e import DOMAIN, home_assistant, install, point_at, setup  # noqa: E402
+
+
+def home_from_frames(recorded):
+    """A device list with every device the frames push state for.
+
+    Each device starts from its type's fake_cloud template overlaid with
+    every field the frames ever reported for it, so entities can be
+    built from it whatever subset the pushes carry.
+    """
+    templates = {
+        group["type"]: group["devices"][0]["operation"]
+        for group in fake_cloud.build_home(1, 1, 1, 1, 1)
+    }
+    operations = {}
+    for _, raw_message in recorded:
+        data = json.loads(raw_message).get("data")
+        if not isinstance(data, dict):
+            continue
+        for device in data.get("devices", []):
+            operations.setdefault(device["uid"], {}).update(device.get("operation", {}))
+
+    groups = {}
+    for uid, operation in operations.items():
+        device_type = operation.get("type")
+        if device_type not in templates:
+            continue
+        devices = groups.setdefault(device_type, [])
+        devices.append(
+            {
+                "uid": uid,
+                "device_name": f"replay{len(devices) % 9 + 1}",
+                "location_name": "replay",
+                "operation": templates[device_type] | operation,
+            }
+        )
+    return [{"type": t, "devices": devices} for t, devices in groups.items()]
+
+
+async def replay(hass, recorded, speed):
+    coordinator = hass.data[DOMAIN]
+    loop = asyncio.get_running_loop()
+    first = recorded[0][0]
+    started = loop.time()
+    for timestamp, raw_message in recorded:
+        if speed:
+            delay = (timestamp - first) / speed - (loop.time() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        coordinator.handle_push_frame(coordinator._decode_frame(raw_message))
+    await hass.async_block_till_done()
+    return loop.time() - started
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as directory:
+        certfile, keyfile = fake_cloud.self_signed_certificate(directory)
+        config_dir = Path(directory) / "config"
+        config_dir.mkdir()
+        install(config_dir)
+        frames = importlib.import_module(f"custom_components.{DOMAIN}.frames")
+        recorded = [frame for path in args.frames for frame in frames.read_frames(path)]
+        if not recorded:
+            raise SystemExit("no frames recorded")
+
+        cloud = fake_cloud.FakeCloud(home_from_frames(recorded))
+        await cloud.start(ssl_context=fake_cloud.server_ssl_context(certfile, keyfile))
+        helper = point_at(cloud, certfile)
+        try:
+            async with home_assistant(config_dir) as hass:
+                credentials = helper.Credentials("replay", "replay").to_dict()
+                await setup(hass, credentials)
+                coordinator = hass.data[DOMAIN]
+                for n in range(args.repeat):
+                    stats = dict(coordinator.dispatch_stats)
+                    started = time.process_time()
+                    elapsed = await replay(hass, recorded, args.speed)
+                    print(
+                        json.dumps(
+                            {
+                                "bench": "replay",
+                                "pass": n,
+                                "frames": len(recorded),
+                                "speed": args.speed,
+                                "seconds": elapsed,
+                                "cpu_seconds": time.process_time() - started,
+                                "frames_per_second": len(recorded) / elapsed,
+                                "dispatch": {
+                                    key: value - stats[key]
+                                    for key, value in coordinator.dispatch_stats.items()
+                                },
+                            }
+                        ),
+                        flush=True,
+                    )
+        finally:
+            await cloud.stop()
+            await helper.close_http_session()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("frames", nargs="+", type=Path)
+    parser.add_argument(
+        "--speed", type=float, default=0, help="1 = recorded pace, 0 = flat out"
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()